@@ -0,0 +1,39 @@
+"""glucose alerts
+
+Revision ID: 8b3d5f2a6c91
+Revises: 4e2f8a9c1b7d
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8b3d5f2a6c91'
+down_revision: Union[str, None] = '4e2f8a9c1b7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('glucose_alerts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('rule', sa.String(), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('timestamp', sa.Integer(), nullable=False),
+    sa.Column('message', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_glucose_alerts_id'), 'glucose_alerts', ['id'], unique=False)
+    op.create_index(op.f('ix_glucose_alerts_timestamp'), 'glucose_alerts', ['timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_glucose_alerts_timestamp'), table_name='glucose_alerts')
+    op.drop_index(op.f('ix_glucose_alerts_id'), table_name='glucose_alerts')
+    op.drop_table('glucose_alerts')
@@ -0,0 +1,52 @@
+"""glucose coverage runs
+
+Revision ID: a6c4e8f1d203
+Revises: f3b9e2d4a618
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+import os
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c4e8f1d203'
+down_revision: Union[str, None] = 'f3b9e2d4a618'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same setting and default as app.repositories.coverage_repository, read here so this revision doesn't import app code
+COVERAGE_MAX_GAP_SECONDS = int(os.getenv("COVERAGE_MAX_GAP_SECONDS", "300"))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('glucose_coverage_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('start_ts', sa.Integer(), nullable=False),
+    sa.Column('end_ts', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_glucose_coverage_runs_start_ts'), 'glucose_coverage_runs', ['start_ts'], unique=True)
+    op.create_index(op.f('ix_glucose_coverage_runs_end_ts'), 'glucose_coverage_runs', ['end_ts'], unique=False)
+    # Seed runs from the live table: a new run starts wherever the spacing to the previous reading exceeds the gap threshold
+    op.execute(sa.text("""
+        INSERT INTO glucose_coverage_runs (start_ts, end_ts)
+        SELECT MIN(timestamp), MAX(timestamp) FROM (
+            SELECT timestamp, SUM(new_run) OVER (ORDER BY timestamp) AS run FROM (
+                SELECT timestamp,
+                       CASE WHEN timestamp - LAG(timestamp) OVER (ORDER BY timestamp) <= :max_gap THEN 0 ELSE 1 END AS new_run
+                FROM glucose_readings
+            ) AS marked
+        ) AS numbered
+        GROUP BY run
+    """).bindparams(max_gap=COVERAGE_MAX_GAP_SECONDS))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_glucose_coverage_runs_end_ts'), table_name='glucose_coverage_runs')
+    op.drop_index(op.f('ix_glucose_coverage_runs_start_ts'), table_name='glucose_coverage_runs')
+    op.drop_table('glucose_coverage_runs')
@@ -0,0 +1,81 @@
+"""reading local calendar keys
+
+Revision ID: b9d2f6a4c817
+Revises: a6c4e8f1d203
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+import os
+from datetime import date, datetime
+from typing import Sequence, Union
+from zoneinfo import ZoneInfo
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d2f6a4c817'
+down_revision: Union[str, None] = 'a6c4e8f1d203'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same setting and default as app.core.local_time, read here so this revision doesn't import app code
+LOCAL_TIMEZONE = os.getenv("LOCAL_TIMEZONE", "UTC")
+
+BATCH = 10000
+EPOCH_DATE = date(1970, 1, 1)
+
+
+def _local_keys(ts: int, zone: ZoneInfo) -> tuple:
+    dt = datetime.fromtimestamp(ts, zone)
+    return (dt.date() - EPOCH_DATE).days, dt.hour * 60 + dt.minute
+
+
+def _batches(conn, table, key):
+    """Yield rows of (key, timestamp) in key order, BATCH at a time"""
+    last = None
+    while True:
+        stmt = sa.select(table.c[key], table.c.timestamp).order_by(table.c[key]).limit(BATCH)
+        if last is not None:
+            stmt = stmt.where(table.c[key] > last)
+        rows = conn.execute(stmt).all()
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
+
+
+def _update_by_key(conn, table, key, values, updates) -> None:
+    if updates:
+        conn.execute(
+            table.update().where(table.c[key] == sa.bindparam("row_key")).values(**{c: sa.bindparam(f"new_{c}") for c in values}),
+            updates,
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    with op.batch_alter_table('glucose_readings') as batch_op:
+        batch_op.add_column(sa.Column('local_day', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('local_minute', sa.SmallInteger(), nullable=True))
+    # Existing rows get keys in the LOCAL_TIMEZONE configured when the migration runs
+    local_zone = ZoneInfo(LOCAL_TIMEZONE)
+    readings = sa.table('glucose_readings', sa.column('id'), sa.column('timestamp'), sa.column('local_day'), sa.column('local_minute'))
+    for rows in _batches(conn, readings, "id"):
+        updates = []
+        for id_, ts in rows:
+            if ts is None:
+                continue
+            day, minute = _local_keys(ts, local_zone)
+            updates.append({"row_key": id_, "new_local_day": day, "new_local_minute": minute})
+        _update_by_key(conn, readings, "id", ["local_day", "local_minute"], updates)
+    op.create_index('ix_glucose_readings_local_calendar', 'glucose_readings', ['local_day', 'local_minute', 'value'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_glucose_readings_local_calendar', table_name='glucose_readings')
+    with op.batch_alter_table('glucose_readings') as batch_op:
+        batch_op.drop_column('local_minute')
+        batch_op.drop_column('local_day')
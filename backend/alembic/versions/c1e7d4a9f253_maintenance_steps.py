@@ -0,0 +1,35 @@
+"""maintenance steps
+
+Revision ID: c1e7d4a9f253
+Revises: b9d2f6a4c817
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1e7d4a9f253'
+down_revision: Union[str, None] = 'b9d2f6a4c817'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('maintenance_steps',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('detail', sa.String(), nullable=False),
+    sa.Column('applied_at', sa.DateTime(), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema. Refused once a step is recorded: dropping its marker would let it run again."""
+    applied = op.get_bind().execute(sa.text("SELECT name FROM maintenance_steps")).scalars().all()
+    if applied:
+        raise RuntimeError(f"Maintenance steps {applied} were applied to the data and cannot be undone by a downgrade")
+    op.drop_table('maintenance_steps')
@@ -0,0 +1,29 @@
+"""api user is_admin
+
+Revision ID: d7a1c3e5f902
+Revises: 8b3d5f2a6c91
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a1c3e5f902'
+down_revision: Union[str, None] = '8b3d5f2a6c91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('api_users') as batch_op:
+        batch_op.add_column(sa.Column('is_admin', sa.Boolean(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('api_users') as batch_op:
+        batch_op.drop_column('is_admin')
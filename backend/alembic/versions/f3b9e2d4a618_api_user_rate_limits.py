@@ -0,0 +1,35 @@
+"""api user rate limits
+
+Revision ID: f3b9e2d4a618
+Revises: d7a1c3e5f902
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b9e2d4a618'
+down_revision: Union[str, None] = 'd7a1c3e5f902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('api_users') as batch_op:
+        batch_op.add_column(sa.Column('read_rate_per_minute', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('read_burst', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('expensive_rate_per_minute', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('expensive_burst', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('api_users') as batch_op:
+        batch_op.drop_column('expensive_burst')
+        batch_op.drop_column('expensive_rate_per_minute')
+        batch_op.drop_column('read_burst')
+        batch_op.drop_column('read_rate_per_minute')
@@ -0,0 +1,42 @@
+import os
+import re
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from app.core.profiler import profile_path
+from app.db.query_log import slow_query_log
+from app.schemas.slow_query import SlowQuery
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["debug"],
+)
+
+
+@router.get("/slow-queries", response_model=List[SlowQuery])
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=200, description="Number of statements to return"),
+    order_by: str = Query("total_ms", pattern="^(total_ms|max_ms|count)$", description="Rank by total_ms, max_ms or count"),
+):
+    """Top slow statements since startup (or the last reset), grouped by normalized SQL"""
+    return slow_query_log.summary(limit, order_by)
+
+
+@router.delete("/slow-queries")
+async def reset_slow_queries():
+    """Clear the slow-query summary"""
+    slow_query_log.clear()
+    return {"message": "Slow-query log cleared"}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """Download a profile stored with `X-Profile: store` as folded stacks (flamegraph.pl / speedscope)"""
+    if not re.fullmatch(r"[0-9a-f]{32}", profile_id):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    path = profile_path(profile_id)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=f"{profile_id}.folded")
@@ -1,8 +1,9 @@
+import asyncio
 import json
 from typing import Annotated, List, Optional
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request
-from fastapi.responses import Response, StreamingResponse
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, WebSocket, WebSocketException, status
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -11,22 +12,44 @@ from app.controllers.glucose_controller import (
     delete_reading_by_id,
     export_readings,
     fetch_remote_readings,
+    get_agp,
+    get_coverage,
+    get_export_artifact,
+    get_export_job,
     get_latest_reading,
     get_reading_by_id,
+    get_stats,
+    list_alerts,
+    list_changes,
     list_readings,
+    list_windows,
     remove_readings,
+    submit_export_job,
 )
 from app.controllers.glucose_controller import (
     stream_readings as controller_stream_readings,
 )
+from app.core.metrics import SSE_SUBSCRIBERS, WS_SUBSCRIBERS
+from app.core.rate_limit import limit_expensive
 from app.db.database import get_db
+from app.schemas import export_job as export_schemas
+from app.schemas import glucose_alert as alert_schemas
+from app.schemas import glucose_coverage as coverage_schemas
 from app.schemas import glucose_reading as schemas
+from app.schemas import glucose_stats as stats_schemas
 from app.schemas.glucose_reading import RemoteReading
+from app.services.export_job_service import MEDIA_TYPES, ExportJob
+from app.services.stream_service import encode_binary
 
 router = APIRouter(
     prefix="/glucose-readings",
     tags=["glucose-readings"],
 )
+# WebSocket routes authenticate with check_websocket_key rather than the HTTP-only check_api_key
+websocket_router = APIRouter(
+    prefix="/glucose-readings",
+    tags=["glucose-readings"],
+)
 
 @router.get("/", response_model=List[schemas.GlucoseReadingResponse])
 async def get_glucose_readings(
@@ -41,7 +64,15 @@ async def get_glucose_readings(
     """Get glucose readings from DB, optionally filtering by from/to epoch timestamps"""
     return await list_readings(db, from_ts, to_ts, skip, limit, order, granularity)
 
-@router.put("/", response_model=list[schemas.GlucoseReadingResponse])
+@router.post("/windows", response_model=list[schemas.WindowSeries])
+async def get_glucose_reading_windows(
+    request: schemas.ReadingWindowsRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Fetch many windows in one request for overlay/comparison charts. Readings carry an offset from their window start."""
+    return await list_windows(db, request.windows)
+
+@router.put("/", response_model=list[schemas.GlucoseReadingResponse], dependencies=[Depends(limit_expensive)])
 async def create_glucose_readings(
     readings: Annotated[list[schemas.GlucoseReadingCreate], Body(embed=True)],
     db: AsyncSession = Depends(get_db)
@@ -49,7 +80,7 @@ async def create_glucose_readings(
     """Create new glucose readings"""
     return await bulk_create_readings(db, readings)
 
-@router.delete("/", response_model=list[schemas.GlucoseReadingResponse])
+@router.delete("/", response_model=list[schemas.GlucoseReadingResponse], dependencies=[Depends(limit_expensive)])
 async def delete_glucose_readings(
     ids: Optional[list[str]] = Query(None, description="List of glucose reading IDs to delete"),
     from_ts: Optional[int] = Query(None, alias="from", description="Epoch start timestamp (inclusive)"),
@@ -61,7 +92,7 @@ async def delete_glucose_readings(
     """Delete glucose readings from DB, optionally filtering by from/to epoch timestamps"""
     return await remove_readings(db, ids, from_ts, to_ts)
 
-@router.get("/export")
+@router.get("/export", dependencies=[Depends(limit_expensive)])
 async def export_glucose_readings(
     from_ts: Optional[int] = Query(None, alias="from", description="Epoch start timestamp (inclusive)"),
     to_ts: Optional[int] = Query(None, alias="to", description="Epoch end timestamp (inclusive)"),
@@ -82,6 +113,78 @@ async def export_glucose_readings(
     else:  # json format
         return result
 
+def _export_job_status(job: ExportJob) -> export_schemas.ExportJobStatus:
+    return export_schemas.ExportJobStatus(**job.__dict__, format=job.format, expires_at=job.expires_at)
+
+@router.post("/export/jobs", response_model=export_schemas.ExportJobStatus, status_code=202, dependencies=[Depends(limit_expensive)])
+async def create_export_job(params: export_schemas.ExportJobCreate):
+    """Start a background export. Identical parameters share one job and artifact until it expires."""
+    job = await submit_export_job(params.format, params.from_ts, params.to_ts, params.skip, params.limit, params.granularity)
+    return _export_job_status(job)
+
+@router.get("/export/jobs/{job_id}", response_model=export_schemas.ExportJobStatus)
+async def get_export_job_status(job_id: str):
+    """Poll the status and progress of an export job"""
+    return _export_job_status(await get_export_job(job_id))
+
+@router.get("/export/jobs/{job_id}/download")
+async def download_export_job(job_id: str):
+    """Download a finished export. Supports HTTP Range requests for resuming."""
+    job = await get_export_artifact(job_id)
+    return FileResponse(
+        job.path,
+        media_type=MEDIA_TYPES[job.format],
+        filename=f"glucose-readings-{job.id[:8]}.{job.format}",
+    )
+
+@router.get("/stats", response_model=stats_schemas.GlucoseStatsResponse)
+async def get_glucose_stats(
+    from_ts: Optional[int] = Query(None, alias="from", description="Epoch start timestamp (inclusive)"),
+    to_ts: Optional[int] = Query(None, alias="to", description="Epoch end timestamp (inclusive)"),
+    granularity: str = Query("1d", description="Bucket size for per-bucket aggregates (1m, 1h, 1d, 1w); 1d and 1w follow the local calendar"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Summary statistics (mean, SD, CV, GMI, time in range) and per-bucket aggregates"""
+    return await get_stats(db, from_ts, to_ts, granularity)
+
+@router.get("/agp", response_model=list[stats_schemas.AgpBin])
+async def get_glucose_agp(
+    from_ts: Optional[int] = Query(None, alias="from", description="Epoch start timestamp (inclusive)"),
+    to_ts: Optional[int] = Query(None, alias="to", description="Epoch end timestamp (inclusive)"),
+    bin_minutes: int = Query(15, description="Width of each time-of-day bin in minutes"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Ambulatory glucose profile: 5/25/50/75/95th percentiles by local time of day"""
+    return await get_agp(db, from_ts, to_ts, bin_minutes)
+
+@router.get("/coverage", response_model=coverage_schemas.GlucoseCoverage)
+async def get_glucose_coverage(
+    from_ts: Optional[int] = Query(None, alias="from", description="Epoch start timestamp (default: 14 days before `to`)"),
+    to_ts: Optional[int] = Query(None, alias="to", description="Epoch end timestamp (default: now)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Sensor coverage and missing intervals, answered from the coverage run index rather than a scan of readings"""
+    return await get_coverage(db, from_ts, to_ts)
+
+@router.get("/changes", response_model=schemas.GlucoseReadingChanges)
+async def get_glucose_reading_changes(
+    since: int = Query(0, description="Return changes with a sequence number greater than this"),
+    limit: int = Query(1000, ge=1, le=10000, description="Maximum number of changes to return"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Incremental change feed of inserts, updates and deletes (tombstones) for client sync"""
+    return await list_changes(db, since, limit)
+
+@router.get("/alerts", response_model=List[alert_schemas.GlucoseAlert])
+async def get_glucose_alerts(
+    from_ts: Optional[int] = Query(None, alias="from", description="Epoch start timestamp (inclusive)"),
+    to_ts: Optional[int] = Query(None, alias="to", description="Epoch end timestamp (inclusive)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of alerts to return"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Alerts fired by the ingest-time rules, newest first"""
+    return await list_alerts(db, from_ts, to_ts, limit)
+
 @router.get("/latest", response_model=schemas.GlucoseReadingResponse)
 async def get_latest_glucose_reading(db: AsyncSession = Depends(get_db)):
     """Get the latest glucose reading from the database"""
@@ -94,7 +197,7 @@ async def fetch_and_save_remote_readings(db: AsyncSession) -> List[RemoteReading
     """Fetch remote glucose readings and upsert into the database via service"""
     return await fetch_remote_readings(db)
 
-@router.post("/import", response_model=list[schemas.GlucoseReadingResponse])
+@router.post("/import", response_model=list[schemas.GlucoseReadingResponse], dependencies=[Depends(limit_expensive)])
 async def import_glucose_readings(
     readings: Annotated[list[schemas.GlucoseReadingCreate], Body(embed=True)],
     format: Annotated[str, Body(embed=True)] = "json",
@@ -106,21 +209,32 @@ async def import_glucose_readings(
 @router.get("/stream")
 async def stream_readings(
     request: Request,
-    limit: int = 1,
-    granularity: str = "1m",
+    limit: int = Query(1, ge=0, description="Number of recent readings to send on connect"),
+    granularity: str = Query("1m", description="Granularity of readings (all, 1m, 1h, 1d). Default is 1m."),
 ):
-    """Stream events from the server"""
-    # TODO: limit and granularity may be used in the future to filter the data
+    """Stream readings and alerts as server-sent events"""
+    events = controller_stream_readings(granularity, backfill_limit=limit)
+
     async def event_stream():
-        while True:
-            logger.debug("Waiting for new data...")
-            if await request.is_disconnected():
-                break
-            
-            data = await controller_stream_readings()
-            # send JSON-formatted data for easier client parsing
-            yield f"data: {json.dumps(data)}\n\n"
-        
+        SSE_SUBSCRIBERS.inc()
+        try:
+            async for event, data in events:
+                if await request.is_disconnected():
+                    break
+                # send JSON-formatted data for easier client parsing
+                if event == "backfill":
+                    if not data:
+                        continue
+                    data = [{"value": r.value, "timestamp": r.timestamp} for r in data]
+                elif event == "reading":
+                    data = [data]
+                else:
+                    yield f"event: {event}\n"
+                yield f"data: {json.dumps(data)}\n\n"
+        finally:
+            await events.aclose()
+            SSE_SUBSCRIBERS.dec()
+
     return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 @router.get("/{reading_id}", response_model=schemas.GlucoseReadingResponse)
@@ -128,7 +242,52 @@ async def get_glucose_reading(reading_id: int, db: AsyncSession = Depends(get_db
     """Get a specific glucose reading by ID"""
     return await get_reading_by_id(db, reading_id)
 
-@router.delete("/{reading_id}")
+@router.delete("/{reading_id}", dependencies=[Depends(limit_expensive)])
 async def delete_glucose_reading(reading_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a glucose reading"""
-    return await delete_reading_by_id(db, reading_id)
\ No newline at end of file
+    return await delete_reading_by_id(db, reading_id)
+
+
+@websocket_router.websocket("/ws")
+async def websocket_readings(
+    websocket: WebSocket,
+    granularity: str = Query("1m", description="Granularity of readings (all, 1m, 1h, 1d). Default is 1m."),
+    backfill: int = Query(3600, ge=0, description="Seconds of history to send on connect"),
+    encoding: str = Query("json", description="Reading frames as json text or packed binary"),
+):
+    """Stream readings and alerts over a WebSocket, downsampled to the subscription's granularity"""
+    if encoding not in ("json", "binary"):
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=f"Invalid encoding: {encoding}")
+    try:
+        events = controller_stream_readings(granularity, backfill_seconds=backfill)
+    except HTTPException as e:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+    await websocket.accept()
+
+    async def send_events():
+        try:
+            async for event, data in events:
+                if event == "alert":
+                    # Alerts are rare; always JSON so clients needn't decode them from binary
+                    await websocket.send_json({"type": "alert", **data})
+                elif encoding == "binary":
+                    await websocket.send_bytes(encode_binary(event, data if event == "backfill" else [data]))
+                elif event == "backfill":
+                    await websocket.send_json({"type": "backfill", "readings": [[r.timestamp, r.value] for r in data]})
+                else:
+                    await websocket.send_json({"type": "reading", **data})
+        except Exception as e:
+            logger.warning(f"WebSocket stream failed: {e!r}")
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+
+    WS_SUBSCRIBERS.inc()
+    sender = asyncio.ensure_future(send_events())
+    try:
+        # Clients don't send anything; receiving only notices when they go away
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        WS_SUBSCRIBERS.dec()
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+        await events.aclose()
@@ -1,16 +1,11 @@
-from typing import Annotated, List, Optional
+from typing import List
 
-import fetch_glucose
-from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Response
 from loguru import logger
-from sqlalchemy import select
-from sqlalchemy.dialects.sqlite import insert as sqlite_insert
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.database import get_db
-from app.models import glucose_reading as models
-from app.schemas import glucose_reading as schemas
+from app.schemas.current_reading import CurrentReading
 from app.schemas.glucose_reading import RemoteReading
+from app.services.libre_view_service import UpstreamUnavailable, get_snapshot
 
 router = APIRouter(
     prefix="/libre-view",
@@ -18,27 +13,36 @@ router = APIRouter(
 )
 
 
+def _set_staleness_headers(response: Response, metadata: dict) -> None:
+    response.headers["X-Data-Fetched-At"] = f"{metadata['fetched_at']:.0f}"
+    response.headers["X-Data-Age"] = f"{metadata['age']:.0f}"
+    response.headers["X-Data-Stale"] = str(metadata["stale"]).lower()
+    response.headers["X-Upstream-Circuit"] = metadata["circuit"]
+
+
 @router.get("/", response_model=List[RemoteReading])
-async def get_libre_view_readings(db: AsyncSession = Depends(get_db)):
-    """Fetch glucose readings from remote API and return list of RemoteReading"""
+async def get_libre_view_readings(response: Response):
+    """Latest LibreView readings, served from the poller's snapshot with staleness headers"""
     logger.debug("get_libre_view_readings called")
     try:
-        token = await fetch_glucose.get_token()
-        logger.debug(f"Retrieved token: {token[:8]}... (truncated)")
-        readings = await fetch_glucose.fetch_glucose_readings(token)
-        return readings["readings"]
-    except Exception as e:
-        logger.exception("Error in get_libre_view_readings")
-        raise HTTPException(status_code=500, detail=str(e))
-    
-    
+        readings, metadata = await get_snapshot()
+    except UpstreamUnavailable as e:
+        logger.warning(f"get_libre_view_readings: upstream unavailable ({e})")
+        raise HTTPException(status_code=503, detail=str(e))
+    _set_staleness_headers(response, metadata)
+    return readings["readings"]
+
+
 @router.get("/current", response_model=CurrentReading)
-async def get_current_reading(db: AsyncSession = Depends(get_db)):
-    """Fetch current glucose reading from remote API"""
+async def get_current_reading(response: Response):
+    """Current LibreView glucose measurement, served from the poller's snapshot with staleness headers"""
     try:
-        token = await fetch_glucose.get_token()
-        readings = await fetch_glucose.fetch_glucose_readings(token)
-        return readings["current_measurement"]
-    except Exception as e:
-        logger.exception("Error in get_current_reading")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        readings, metadata = await get_snapshot()
+    except UpstreamUnavailable as e:
+        logger.warning(f"get_current_reading: upstream unavailable ({e})")
+        raise HTTPException(status_code=503, detail=str(e))
+    if not readings["current_measurement"] or not readings["readings"]:
+        raise HTTPException(status_code=404, detail="No current measurement")
+    _set_staleness_headers(response, metadata)
+    # extract_readings appends the parsed current measurement last
+    return readings["readings"][-1]
@@ -1,15 +1,30 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 
 from app.schemas.glucose_reading import GlucoseReading as GlucoseReadingSchema
-from app.schemas.glucose_reading import GlucoseReadingCreate, RemoteReading
+from app.schemas.glucose_reading import (
+    GlucoseReadingCreate,
+    ReadingWindow,
+    RemoteReading,
+    WindowSeries,
+)
+from app.services.alert_service import get_alerts as svc_get_alerts
+from app.services.analytics_service import get_glucose_agp as svc_get_agp
+from app.services.analytics_service import get_glucose_stats as svc_get_stats
+from app.services.coverage_service import get_coverage as svc_get_coverage
+from app.services.export_job_service import ExportJob
+from app.services.export_job_service import get_export_job as svc_get_export_job
+from app.services.export_job_service import submit_export_job as svc_submit_export_job
 from app.services.glucose_service import create_bulk_readings as svc_create_bulk
 from app.services.glucose_service import create_glucose_reading as svc_create
 from app.services.glucose_service import delete_glucose_readings as svc_delete_readings
 from app.services.glucose_service import export_glucose_readings as svc_export
 from app.services.glucose_service import fetch_and_save_remote as svc_fetch_remote
 from app.services.glucose_service import get_glucose_readings as svc_get_readings
+from app.services.glucose_service import get_glucose_windows as svc_get_windows
 from app.services.glucose_service import get_latest_glucose_reading as svc_get_latest
-from app.services.glucose_service import stream_glucose_readings as svc_stream_readings
+from app.services.glucose_service import get_reading_changes as svc_get_changes
+from app.services.glucose_service import GRANULARITY_INTERVALS
+from app.services.stream_service import subscribe_readings as svc_subscribe_readings
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -25,6 +40,27 @@ async def list_readings(
 ) -> List[GlucoseReadingSchema]:
     return await svc_get_readings(session, from_ts, to_ts, skip, limit, order, granularity)
 
+async def list_windows(
+    session: AsyncSession,
+    windows: List[ReadingWindow]
+) -> List[WindowSeries]:
+    for w in windows:
+        if w.from_ts > w.to_ts:
+            raise HTTPException(status_code=400, detail="Window 'from' must not be after 'to'")
+    try:
+        series = await svc_get_windows(session, [(w.from_ts, w.to_ts, w.granularity) for w in windows])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [
+        WindowSeries(
+            from_ts=w.from_ts,
+            to_ts=w.to_ts,
+            granularity=w.granularity,
+            readings=[dict(offset=r.timestamp - w.from_ts, value=r.value, timestamp=r.timestamp) for r in rows],
+        )
+        for w, rows in zip(windows, series)
+    ]
+
 async def bulk_create_readings(
     session: AsyncSession,
     readings: List[GlucoseReadingCreate],
@@ -51,6 +87,78 @@ async def export_readings(
 ):
     return await svc_export(session, format, from_ts, to_ts, skip, limit, granularity)
 
+async def submit_export_job(
+    format: str = "csv",
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    granularity: str = "all"
+) -> ExportJob:
+    try:
+        return svc_submit_export_job(format, from_ts, to_ts, skip, limit, granularity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def get_export_job(job_id: str) -> ExportJob:
+    job = svc_get_export_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
+
+async def get_export_artifact(job_id: str) -> ExportJob:
+    job = await get_export_job(job_id)
+    if job.status != "completed":
+        raise HTTPException(status_code=409, detail=f"Export job is {job.status}")
+    return job
+
+async def get_stats(
+    session: AsyncSession,
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+    granularity: str = "1d"
+) -> dict:
+    try:
+        return await svc_get_stats(session, from_ts, to_ts, granularity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def get_agp(
+    session: AsyncSession,
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+    bin_minutes: int = 15
+) -> List[dict]:
+    try:
+        return await svc_get_agp(session, from_ts, to_ts, bin_minutes)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def get_coverage(
+    session: AsyncSession,
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None
+) -> dict:
+    try:
+        return await svc_get_coverage(session, from_ts, to_ts)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def list_changes(
+    session: AsyncSession,
+    since: int = 0,
+    limit: int = 1000
+) -> dict:
+    return await svc_get_changes(session, since, limit)
+
+async def list_alerts(
+    session: AsyncSession,
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+    limit: int = 100
+) -> list:
+    return await svc_get_alerts(session, from_ts, to_ts, limit)
+
 async def get_latest_reading(
     session: AsyncSession
 ) -> GlucoseReadingSchema:
@@ -82,5 +190,14 @@ async def delete_reading_by_id(
     return {"message": "Reading deleted successfully"}
 
 
-async def stream_readings() -> List[dict]:
-    return await svc_stream_readings()
\ No newline at end of file
+def stream_readings(
+    granularity: str = "1m",
+    backfill_seconds: Optional[int] = None,
+    backfill_limit: Optional[int] = None
+) -> AsyncIterator[Tuple[str, object]]:
+    if granularity != "all" and granularity not in GRANULARITY_INTERVALS:
+        raise HTTPException(status_code=400, detail=f"Invalid granularity: {granularity}")
+    if backfill_seconds is None:
+        # Enough history for `backfill_limit` readings at this granularity, allowing for gaps
+        backfill_seconds = 2 * (backfill_limit or 0) * GRANULARITY_INTERVALS.get(granularity, 60)
+    return svc_subscribe_readings(granularity, backfill_seconds, backfill_limit)
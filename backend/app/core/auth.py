@@ -0,0 +1,57 @@
+from typing import Optional
+
+from app.core.rate_limit import check_read_budget
+from app.db.database import SessionLocal
+from app.models.api_user import ApiUser
+from fastapi import HTTPException, Request, Security, WebSocket, WebSocketException, status
+from fastapi.security import APIKeyHeader
+from sqlalchemy import select
+
+api_key_header = APIKeyHeader(name="X-API-KEY", auto_error=False)
+
+
+async def get_api_user(api_key: Optional[str]) -> Optional[ApiUser]:
+    """Active ApiUser owning the key, or None"""
+    if not api_key:
+        return None
+    async with SessionLocal() as db:
+        stmt = select(ApiUser).where(ApiUser.api_key == api_key)
+        result = await db.execute(stmt)
+        user = result.scalar_one_or_none()
+    if not user or not user.is_active:
+        return None
+    return user
+
+
+async def is_admin_key(api_key: Optional[str]) -> bool:
+    user = await get_api_user(api_key)
+    return user is not None and user.is_admin
+
+
+async def check_api_key(request: Request, api_key: str = Security(api_key_header)) -> None:
+    user = await get_api_user(api_key)
+    if user is None:
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    check_read_budget(user)
+    # For per-key limits further down the dependency chain
+    request.state.api_user = user
+
+
+async def check_websocket_key(websocket: WebSocket) -> None:
+    """check_api_key for WebSocket routes; browsers can't set headers there, so `?api_key=` is accepted too"""
+    user = await get_api_user(websocket.headers.get("X-API-KEY") or websocket.query_params.get("api_key"))
+    if user is None:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid API key")
+    try:
+        check_read_budget(user)
+    except HTTPException as e:
+        raise WebSocketException(code=status.WS_1013_TRY_AGAIN_LATER, reason=e.detail)
+    websocket.state.api_user = user
+
+
+async def check_admin_key(api_key: str = Security(api_key_header)) -> None:
+    user = await get_api_user(api_key)
+    if user is None:
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    if not user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin API key required")
@@ -0,0 +1,67 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Sequence
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "process" sidesteps the GIL for pure-Python rendering/parsing, "thread" avoids
+# pickling overhead, "inline" runs on the event loop (debugging only)
+CPU_EXECUTOR = os.getenv("CPU_EXECUTOR", "process")
+CPU_WORKERS = int(os.getenv("CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Rows per hand-off; large enough to amortise pickling, small enough to keep workers busy
+CPU_CHUNK_SIZE = int(os.getenv("CPU_CHUNK_SIZE", "20000"))
+
+_executor: Optional[Executor] = None
+
+
+def get_executor() -> Optional[Executor]:
+    global _executor
+    if _executor is None and CPU_EXECUTOR != "inline":
+        if CPU_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=CPU_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="cpu")
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_cpu(fn: Callable, *args) -> Any:
+    """Run a CPU-bound function off the event loop. With a process pool, fn and args must be picklable."""
+    executor = get_executor()
+    if executor is None:
+        return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+def chunk_columns(columns: Sequence[list], chunk_size: int = None) -> List[tuple]:
+    """Split parallel column lists into row-aligned chunks of columns"""
+    chunk_size = chunk_size or CPU_CHUNK_SIZE
+    length = len(columns[0]) if columns else 0
+    return [
+        tuple(column[start:start + chunk_size] for column in columns)
+        for start in range(0, length, chunk_size)
+    ]
+
+
+def submit_chunks(fn: Callable, columns: Sequence[list], *args) -> List[asyncio.Future]:
+    """Start fn(*chunk_columns, first, *args) for every chunk; results can be awaited in order"""
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    futures = []
+    for i, chunk in enumerate(chunk_columns(columns)):
+        if executor is None:
+            future = loop.create_future()
+            future.set_result(fn(*chunk, i == 0, *args))
+        else:
+            future = loop.run_in_executor(executor, fn, *chunk, i == 0, *args)
+        futures.append(future)
+    return futures
@@ -0,0 +1,78 @@
+import os
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# The patient's IANA time zone; readings' local_day/local_minute keys and daily buckets follow its calendar
+LOCAL_TIMEZONE = os.getenv("LOCAL_TIMEZONE", "UTC")
+LOCAL_ZONE = ZoneInfo(LOCAL_TIMEZONE)
+
+EPOCH_DATE = date(1970, 1, 1)
+
+
+def local_keys(ts: int) -> Tuple[int, int]:
+    """(local_day, local_minute) of an epoch timestamp: days since 1970-01-01 and minutes since local midnight"""
+    dt = datetime.fromtimestamp(ts, LOCAL_ZONE)
+    return (dt.date() - EPOCH_DATE).days, dt.hour * 60 + dt.minute
+
+
+def with_local_keys(rows: List[dict]) -> List[dict]:
+    """Copies of {"value", "timestamp"} rows with their local_day and local_minute columns filled in"""
+    keyed = []
+    for r in rows:
+        day, minute = local_keys(r["timestamp"])
+        keyed.append({**r, "local_day": day, "local_minute": minute})
+    return keyed
+
+
+def day_start(local_day: int) -> int:
+    """Epoch timestamp of local midnight starting `local_day` (23 or 25 hours apart across DST changes)"""
+    midnight = datetime.combine(EPOCH_DATE + timedelta(days=local_day), time(), LOCAL_ZONE)
+    return int(midnight.timestamp())
+
+
+def week_of(local_day: int) -> int:
+    """Local day of the Monday starting the week containing `local_day` (1970-01-01 was a Thursday)"""
+    return local_day - (local_day + 3) % 7
+
+
+def day_range(from_ts: Optional[int], to_ts: Optional[int], weekly: bool = False) -> Tuple[Optional[int], Optional[int]]:
+    """Local days containing from_ts and to_ts (None stays open), widened to whole Monday-start weeks if weekly"""
+    from_day = None if from_ts is None else local_keys(from_ts)[0]
+    to_day = None if to_ts is None else local_keys(to_ts)[0]
+    if weekly:
+        from_day = None if from_day is None else week_of(from_day)
+        to_day = None if to_day is None else week_of(to_day) + 6
+    return from_day, to_day
+
+
+def day_span(from_day: Optional[int], to_day: Optional[int]) -> Tuple[Optional[int], Optional[int]]:
+    """Inclusive epoch range covering local days from_day..to_day (None stays open)"""
+    from_ts = None if from_day is None else day_start(from_day)
+    to_ts = None if to_day is None else day_start(to_day + 1) - 1
+    return from_ts, to_ts
+
+
+def grid_floor(ts: int, interval: int) -> int:
+    """Last local grid point at or before ts: local midnight for 1d, else a multiple of interval in local time"""
+    if interval == 86400:
+        return day_start(local_keys(ts)[0])
+    offset = int(datetime.fromtimestamp(ts, LOCAL_ZONE).utcoffset().total_seconds())
+    return ts - (ts + offset) % interval
+
+
+def local_grid(from_ts: int, interval: int) -> Iterator[int]:
+    """Ascending local grid points starting at grid_floor(from_ts, interval)"""
+    if interval == 86400:
+        day = local_keys(from_ts)[0]
+        while True:
+            yield day_start(day)
+            day += 1
+    point = grid_floor(from_ts, interval)
+    while True:
+        yield point
+        point += interval
@@ -0,0 +1,51 @@
+import asyncio
+import time
+from typing import Optional
+
+from app.core.metrics import Gauge
+
+# How often the monitor wakes up; lag is how late it wakes up
+SAMPLE_INTERVAL = 0.25
+
+_stats = {"last": 0.0, "max": 0.0, "ewma": 0.0, "samples": 0}
+_task: Optional[asyncio.Task] = None
+
+
+async def _monitor() -> None:
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(SAMPLE_INTERVAL)
+        lag = max(0.0, time.perf_counter() - start - SAMPLE_INTERVAL)
+        _stats["last"] = lag
+        _stats["max"] = max(_stats["max"], lag)
+        _stats["ewma"] = lag if not _stats["samples"] else 0.9 * _stats["ewma"] + 0.1 * lag
+        _stats["samples"] += 1
+
+
+Gauge(
+    "event_loop_lag_seconds",
+    "Event-loop scheduling lag: last sample, max since last /health reset, and EWMA",
+    ("stat",),
+    collect=lambda: {(k,): _stats[k] for k in ("last", "max", "ewma")},
+)
+
+
+def start_loop_monitor() -> None:
+    global _task
+    if _task is None:
+        _task = asyncio.ensure_future(_monitor())
+
+
+def stop_loop_monitor() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        _task = None
+
+
+def loop_lag_stats(reset_max: bool = False) -> dict:
+    """Event-loop scheduling lag in seconds: last sample, max since last reset, and EWMA"""
+    stats = dict(_stats)
+    if reset_max:
+        _stats["max"] = 0.0
+    return stats
@@ -0,0 +1,203 @@
+import bisect
+import functools
+import time
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from app.core.request_context import route_template
+
+# Latency buckets in seconds, shared by every histogram unless overridden
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry: list = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), collect: Optional[Callable] = None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        # Optional scrape-time callback returning a number (unlabelled) or a {label tuple: value} dict
+        self._collect = collect
+        _registry.append(self)
+
+    def _header(self) -> list:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> list:
+        values = self._values
+        if self._collect is not None:
+            collected = self._collect()
+            values = collected if isinstance(collected, dict) else {(): collected}
+        lines = self._header()
+        for labels, value in values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonic counter; label values are passed positionally in labelnames order."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), collect: Optional[Callable] = None):
+        super().__init__(name, help, labelnames, collect)
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    """Point-in-time value, set directly or read from `collect` at scrape time."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels) -> None:
+        self._values[labels] = value
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; observe() is one bisect and three additions."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels) -> None:
+        # Per label tuple: [per-bucket counts (last is +Inf), sum, count]
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def time(self, *labels) -> "_Timer":
+        return _Timer(self, labels)
+
+    def render(self) -> list:
+        lines = self._header()
+        for labels, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+def timed(histogram: Histogram, *labels):
+    """Decorator observing the duration of an async function, labelled with `labels` or the function name"""
+    def decorator(fn):
+        label_values = labels or (fn.__name__,)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start, *label_values)
+        return wrapper
+    return decorator
+
+
+def render_metrics() -> str:
+    """All registered metrics in the Prometheus text exposition format (0.0.4)"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by method, route and status", ("method", "route", "status"))
+HTTP_REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency until the response completes", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+DB_STATEMENT_SECONDS = Histogram("db_statement_duration_seconds", "Database statement execution time by statement type", ("statement",))
+DB_STATEMENT_ERRORS = Counter("db_statement_errors_total", "Database statements that raised", ("statement",))
+DB_OPERATION_SECONDS = Histogram("db_repository_operation_duration_seconds", "Repository call latency, including Parquet archive reads", ("operation",))
+FETCH_LOOP_SECONDS = Histogram("fetch_loop_iteration_duration_seconds", "Duration of one poller iteration", buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+FETCH_LOOP_ERRORS = Counter("fetch_loop_errors_total", "Poller iterations that raised")
+FETCH_LOOP_LAST_SUCCESS = Gauge("fetch_loop_last_success_timestamp_seconds", "Unix time of the last successful poller iteration")
+INGESTED_READINGS = Counter("ingested_readings_total", "Readings written through the ingest path after slot normalization")
+UPSTREAM_REQUEST_SECONDS = Histogram("libre_upstream_request_duration_seconds", "LibreView request latency by endpoint", ("endpoint",))
+UPSTREAM_ERRORS = Counter("libre_upstream_errors_total", "Failed LibreView requests by endpoint and reason", ("endpoint", "reason"))
+SSE_SUBSCRIBERS = Gauge("sse_subscribers", "Open /glucose-readings/stream connections")
+WS_SUBSCRIBERS = Gauge("websocket_subscribers", "Open /glucose-readings/ws connections")
+ALERTS_FIRED = Counter("glucose_alerts_fired_total", "Alerts fired by rule", ("rule",))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, latency and in-flight requests per route template.
+
+    The route template (not the raw path) is used as the label so cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            path = route_template(scope) or "unmatched"
+            HTTP_REQUESTS.inc(scope["method"], path, str(status["code"]))
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], path)
@@ -0,0 +1,156 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Awaitable, Callable, Optional
+from urllib.parse import parse_qs
+
+from dotenv import load_dotenv
+from loguru import logger
+
+load_dotenv()
+
+# Stored profiles are written here as <id>.folded
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+# Sampling period; lower is more detailed but costs more GIL time while a profile is running
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "2"))
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "profile"
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer and counts folded stacks ("outer;...;inner").
+
+    Output is the folded format read by flamegraph.pl, speedscope and inferno.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _requested_mode(scope) -> Optional[str]:
+    """'return' or 'store' if the request asks to be profiled, else None; never touches the body"""
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return "store" if value.decode().lower() == "store" else "return"
+    query = scope.get("query_string", b"")
+    if PROFILE_QUERY_PARAM.encode() in query:
+        values = parse_qs(query.decode()).get(PROFILE_QUERY_PARAM)
+        if values:
+            return "store" if values[-1].lower() == "store" else "return"
+    return None
+
+
+def profile_path(profile_id: str) -> str:
+    return os.path.join(PROFILE_DIR, f"{profile_id}.folded")
+
+
+class ProfilerMiddleware:
+    """ASGI middleware profiling a single request when asked via `X-Profile` or `?profile=`.
+
+    `return` (or any other value) replaces the response with the folded stacks; `store`
+    keeps the response, writes the profile to PROFILE_DIR and names it in `X-Profile-Id`.
+    `authorize(api_key)` must approve the caller. Requests without the flag pay for one
+    header scan and a substring check. The sampler sees the whole event-loop thread, so
+    concurrent requests show up in the profile, and work in the CPU process pool does not.
+    """
+
+    def __init__(self, app, authorize: Callable[[Optional[str]], Awaitable[bool]]):
+        self.app = app
+        self.authorize = authorize
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        mode = _requested_mode(scope)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+        api_key = dict(scope["headers"]).get(b"x-api-key", b"").decode() or None
+        if not await self.authorize(api_key):
+            await _send_text(send, 403, "Profiling requires an admin API key\n")
+            return
+        if self._lock.locked():
+            await _send_text(send, 409, "Another request is being profiled\n")
+            return
+        async with self._lock:
+            await self._profile(scope, receive, send, mode)
+
+    async def _profile(self, scope, receive, send, mode: str):
+        sampler = StackSampler(threading.get_ident(), PROFILE_INTERVAL_MS / 1000)
+        profile_id = uuid.uuid4().hex
+        status = {"code": None}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if mode == "store":
+                    message = {**message, "headers": list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]}
+            if mode == "store":
+                await send(message)
+
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+        elapsed = time.perf_counter() - start
+        folded = sampler.folded()
+        logger.info(
+            f"Profiled {scope['method']} {scope['path']}: {elapsed * 1000:.1f}ms, "
+            f"{sampler.samples} samples, status {status['code']}"
+        )
+        if mode == "store":
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            with open(profile_path(profile_id), "w") as f:
+                f.write(folded)
+            return
+        await _send_text(send, 200, folded, [
+            (b"x-profile-id", profile_id.encode()),
+            (b"x-profile-samples", str(sampler.samples).encode()),
+            (b"x-profile-elapsed-ms", f"{elapsed * 1000:.1f}".encode()),
+            (b"x-profiled-status", str(status["code"]).encode()),
+        ])
+
+
+async def _send_text(send, status: int, body: str, headers: Optional[list] = None) -> None:
+    data = body.encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"text/plain; charset=utf-8"), (b"content-length", str(len(data)).encode())] + (headers or []),
+    })
+    await send({"type": "http.response.body", "body": data})
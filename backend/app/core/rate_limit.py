@@ -0,0 +1,157 @@
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+
+from app.core.metrics import Counter, Gauge
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request
+
+load_dotenv()
+
+# Default per-key budgets; api_users columns override them per key (NULL keeps the default)
+RATE_LIMIT_READ_PER_MINUTE = float(os.getenv("RATE_LIMIT_READ_PER_MINUTE", "600"))
+RATE_LIMIT_READ_BURST = int(os.getenv("RATE_LIMIT_READ_BURST", "100"))
+RATE_LIMIT_EXPENSIVE_PER_MINUTE = float(os.getenv("RATE_LIMIT_EXPENSIVE_PER_MINUTE", "10"))
+RATE_LIMIT_EXPENSIVE_BURST = int(os.getenv("RATE_LIMIT_EXPENSIVE_BURST", "3"))
+# Expensive operations (export, import, delete) running at once across all keys, and how many may wait
+EXPENSIVE_MAX_CONCURRENCY = int(os.getenv("EXPENSIVE_MAX_CONCURRENCY", "2"))
+EXPENSIVE_QUEUE_SIZE = int(os.getenv("EXPENSIVE_QUEUE_SIZE", "8"))
+EXPENSIVE_QUEUE_TIMEOUT_SECONDS = float(os.getenv("EXPENSIVE_QUEUE_TIMEOUT_SECONDS", "10"))
+
+RATE_LIMITED = Counter("rate_limited_requests_total", "Requests rejected with 429 by reason", ("reason",))
+
+
+class TokenBucket:
+    """Refills lazily at `rate` tokens per second up to `capacity`; no background task."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """Take a token; returns 0 on success, else seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        if self.rate <= 0:
+            return 60.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Per-key token buckets, one per budget ("read" and "expensive")."""
+
+    def __init__(self):
+        self._buckets: dict = {}
+
+    def check(self, key, kind: str, per_minute: float, burst: int) -> float:
+        bucket = self._buckets.get((key, kind))
+        # Rebuilt when the key's limits change, e.g. after editing api_users
+        if bucket is None or bucket.capacity != burst or bucket.rate != per_minute / 60:
+            bucket = self._buckets[(key, kind)] = TokenBucket(per_minute / 60, burst)
+        return bucket.try_acquire()
+
+
+class Saturated(Exception):
+    pass
+
+
+class ConcurrencyLimiter:
+    """Global cap on concurrent expensive operations with a bounded FIFO wait queue."""
+
+    def __init__(self, limit: int, queue_size: int, timeout: float):
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(limit)
+        self.running = 0
+        self.waiting = 0
+
+    async def acquire(self) -> None:
+        if self._semaphore.locked() and self.waiting >= self.queue_size:
+            raise Saturated("queue_full")
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            raise Saturated("queue_timeout")
+        finally:
+            self.waiting -= 1
+        self.running += 1
+
+    def release(self) -> None:
+        self.running -= 1
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def held(self):
+        """Hold a slot for work already admitted (e.g. a background export job), waiting as long as it takes"""
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.release()
+
+
+rate_limiter = RateLimiter()
+expensive_slots = ConcurrencyLimiter(EXPENSIVE_MAX_CONCURRENCY, EXPENSIVE_QUEUE_SIZE, EXPENSIVE_QUEUE_TIMEOUT_SECONDS)
+
+Gauge("expensive_operations", "Expensive operations running and queued", ("state",),
+      collect=lambda: {("running",): expensive_slots.running, ("waiting",): expensive_slots.waiting})
+
+
+def _too_many(reason: str, retry_after: float, detail: str = "Rate limit exceeded") -> HTTPException:
+    RATE_LIMITED.inc(reason)
+    return HTTPException(
+        status_code=429,
+        detail=f"{detail} ({reason})",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def _limit(user, name: str, default):
+    value = getattr(user, name, None)
+    return default if value is None else value
+
+
+def check_read_budget(user) -> None:
+    """Charge one read token to the key; every authenticated request pays this"""
+    retry_after = rate_limiter.check(
+        user.id, "read",
+        _limit(user, "read_rate_per_minute", RATE_LIMIT_READ_PER_MINUTE),
+        _limit(user, "read_burst", RATE_LIMIT_READ_BURST),
+    )
+    if retry_after:
+        raise _too_many("read", retry_after)
+
+
+async def limit_expensive(request: Request):
+    """Route dependency for export/import/delete: charges the expensive budget, then holds a global slot for the request"""
+    user = getattr(request.state, "api_user", None)
+    if user is not None:
+        retry_after = rate_limiter.check(
+            user.id, "expensive",
+            _limit(user, "expensive_rate_per_minute", RATE_LIMIT_EXPENSIVE_PER_MINUTE),
+            _limit(user, "expensive_burst", RATE_LIMIT_EXPENSIVE_BURST),
+        )
+        if retry_after:
+            raise _too_many("expensive", retry_after)
+    try:
+        await expensive_slots.acquire()
+    except Saturated as e:
+        raise _too_many(str(e), EXPENSIVE_QUEUE_TIMEOUT_SECONDS, "Too many expensive operations in progress")
+    try:
+        yield
+    finally:
+        expensive_slots.release()
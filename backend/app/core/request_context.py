@@ -0,0 +1,41 @@
+from contextvars import ContextVar
+from typing import Optional
+
+# ASGI scope of the request being served; routing fills in scope["route"] before the endpoint runs
+_current_scope: ContextVar[Optional[dict]] = ContextVar("current_scope", default=None)
+
+
+def route_template(scope: dict) -> Optional[str]:
+    """URL template of the matched route as clients see it (root_path and include prefixes included), or None"""
+    template = getattr(scope.get("route"), "path", None)
+    if not template:
+        return None
+    # route.path is relative to its router's prefix, which has no parameters: it is whatever
+    # precedes the template's segments in the concrete path
+    parts = scope["path"].split("/")
+    return "/".join(parts[:len(parts) - template.count("/")]) + template
+
+
+def current_endpoint() -> Optional[str]:
+    """'METHOD /route/template' of the request on whose behalf the caller runs, or None outside a request"""
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+    return f"{scope['method']} {route_template(scope) or scope['path']}"
+
+
+class RequestContextMiddleware:
+    """ASGI middleware making the current request visible to code far from the router (e.g. engine events)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
@@ -0,0 +1,47 @@
+import asyncio
+import os
+from contextlib import contextmanager
+from typing import Iterator
+
+from dotenv import load_dotenv
+from loguru import logger
+
+load_dotenv()
+
+# Events buffered per subscriber; a subscriber that falls further behind loses its oldest events
+EVENT_HUB_QUEUE_SIZE = int(os.getenv("EVENT_HUB_QUEUE_SIZE", "1000"))
+
+
+class EventHub:
+    """In-process fan-out: every subscriber gets its own bounded queue of every published event.
+
+    Events are plain dicts with a "type" key ("readings" or "alert"); nothing is serialized here.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._subscribers: set = set()
+        self.dropped = 0
+
+    def publish(self, event: dict) -> None:
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+
+    @contextmanager
+    def subscribe(self) -> Iterator[asyncio.Queue]:
+        queue = asyncio.Queue(self.maxsize)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+            logger.debug(f"Event hub: subscriber left, {len(self._subscribers)} remaining")
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+
+event_hub = EventHub(EVENT_HUB_QUEUE_SIZE)
@@ -0,0 +1,122 @@
+import os
+import re
+import time
+from typing import Optional
+
+from app.core.request_context import current_endpoint
+from dotenv import load_dotenv
+from loguru import logger
+
+load_dotenv()
+
+# Statements slower than this are logged and aggregated; a negative value disables the log
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+# Capture EXPLAIN QUERY PLAN the first time a slow statement is seen (SQLite only)
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "true").lower() in ("1", "true", "yes")
+# Distinct normalized statements kept in the summary
+SLOW_QUERY_MAX_STATEMENTS = int(os.getenv("SLOW_QUERY_MAX_STATEMENTS", "200"))
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+# Expanded IN lists and multi-row VALUES differ only in length; fold them so they aggregate together
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_VALUES_ROWS = re.compile(r"(VALUES\s*\(\?\.\.\.\))(?:\s*,\s*\(\?\.\.\.\))+", re.IGNORECASE)
+
+
+def normalize_sql(statement: str) -> str:
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING_LITERAL.sub("?", sql)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(?...)", sql)
+    return _VALUES_ROWS.sub(r"\1, ...", sql)
+
+
+def _shape(params) -> str:
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+    if isinstance(params, (list, tuple)):
+        if len(params) > 8:
+            types = sorted({type(p).__name__ for p in params})
+            return f"({len(params)} x {'|'.join(types)})"
+        return "(" + ", ".join(type(p).__name__ for p in params) + ")"
+    return type(params).__name__
+
+
+def parameter_shape(parameters, executemany: bool) -> str:
+    """Types (never values) of the bound parameters, e.g. '(int, int)' or '500 x (float, int)'"""
+    if executemany:
+        first = parameters[0] if parameters else ()
+        return f"{len(parameters)} x {_shape(first)}"
+    return _shape(parameters)
+
+
+class SlowQueryLog:
+    """Aggregates slow statements by normalized SQL: count, timing, last shapes, endpoints and plan."""
+
+    def __init__(self, threshold_ms: float, max_statements: int):
+        self.threshold_ms = threshold_ms
+        self.max_statements = max_statements
+        self._entries: dict = {}
+
+    def record(self, conn, cursor, statement: str, parameters, executemany: bool, elapsed: float) -> None:
+        elapsed_ms = elapsed * 1000
+        if self.threshold_ms < 0 or elapsed_ms < self.threshold_ms:
+            return
+        normalized = normalize_sql(statement)
+        endpoint = current_endpoint() or "background"
+        shape = parameter_shape(parameters, executemany)
+        rowcount = cursor.rowcount if cursor is not None and cursor.rowcount >= 0 else None
+        entry = self._entries.get(normalized)
+        if entry is None:
+            if len(self._entries) >= self.max_statements:
+                cheapest = min(self._entries, key=lambda k: self._entries[k]["total_ms"])
+                del self._entries[cheapest]
+            entry = self._entries[normalized] = {
+                "sql": normalized,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "endpoints": {},
+                "plan": self._explain(conn, statement, parameters, executemany),
+            }
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+        entry["last_ms"] = elapsed_ms
+        entry["last_params"] = shape
+        entry["last_rowcount"] = rowcount
+        entry["last_seen"] = time.time()
+        entry["endpoints"][endpoint] = entry["endpoints"].get(endpoint, 0) + 1
+        logger.warning(
+            f"Slow query {elapsed_ms:.1f}ms [{endpoint}] {normalized} params={shape} rows={rowcount}"
+            + (f" plan={entry['plan']}" if entry["count"] == 1 and entry["plan"] else "")
+        )
+
+    def _explain(self, conn, statement: str, parameters, executemany: bool) -> Optional[list]:
+        if not SLOW_QUERY_EXPLAIN or executemany or conn.dialect.name != "sqlite":
+            return None
+        if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")):
+            return None
+        try:
+            # A separate raw cursor on the same connection, so engine events don't fire recursively
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+                return [row[-1] for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except Exception as e:
+            logger.debug(f"Slow query log: EXPLAIN QUERY PLAN failed ({e})")
+            return None
+
+    def summary(self, limit: int = 20, order_by: str = "total_ms") -> list:
+        """Top offenders, by total time (default), max_ms or count"""
+        entries = sorted(self._entries.values(), key=lambda e: e[order_by], reverse=True)
+        return [{**e, "mean_ms": e["total_ms"] / e["count"]} for e in entries[:limit]]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+slow_query_log = SlowQueryLog(SLOW_QUERY_MS, SLOW_QUERY_MAX_STATEMENTS)
@@ -0,0 +1,113 @@
+import bisect
+import os
+from collections import OrderedDict
+from typing import Hashable, Iterable, Optional
+
+from app.core.metrics import Counter, Gauge
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Memory budget for cached series; 0 (the default) disables the cache. Only enable it with a single
+# worker process and no other writers, since invalidation does not cross processes.
+RANGE_CACHE_MAX_BYTES = int(os.getenv("RANGE_CACHE_MAX_BYTES", "0"))
+# Rough footprint of one cached (id, value, timestamp) row tuple plus its list slot
+ROW_BYTES = 150
+ENTRY_OVERHEAD_BYTES = 500
+
+
+class RangeCache:
+    """LRU of computed series keyed by query parameters, bounded by estimated memory.
+
+    Each entry remembers the timestamp range its result was computed from, so a
+    write only evicts entries whose range contains one of the written timestamps.
+    Every write also bumps `generation`; a result computed while it moved is not
+    stored, since it may predate the write. The cache is per process; writes made
+    by other processes are not seen.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[list]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def put(self, key: Hashable, from_ts: Optional[int], to_ts: Optional[int], rows: list, generation: int) -> None:
+        """Store rows computed from data read at `generation` (read it before the query); dropped if a write happened since"""
+        if generation != self.generation:
+            return
+        size = ENTRY_OVERHEAD_BYTES + ROW_BYTES * len(rows)
+        if size > self.max_bytes:
+            return
+        self._pop(key)
+        lo = float("-inf") if from_ts is None else from_ts
+        hi = float("inf") if to_ts is None else to_ts
+        self._entries[key] = (lo, hi, rows, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+
+    def invalidate(self, timestamps: Iterable[int]) -> None:
+        """Evict entries whose range contains any of the written timestamps"""
+        self.generation += 1
+        if not self._entries:
+            return
+        written = sorted(timestamps)
+        if not written:
+            return
+        for key, (lo, hi, _, _) in list(self._entries.items()):
+            i = bisect.bisect_left(written, lo)
+            if i < len(written) and written[i] <= hi:
+                self._pop(key)
+                self.invalidations += 1
+
+    def invalidate_range(self, from_ts: int, to_ts: int) -> None:
+        """Evict entries overlapping [from_ts, to_ts]"""
+        self.generation += 1
+        for key, (lo, hi, _, _) in list(self._entries.items()):
+            if lo <= to_ts and hi >= from_ts:
+                self._pop(key)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+    def _pop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[3]
+
+
+range_cache = RangeCache(RANGE_CACHE_MAX_BYTES)
+
+Gauge("range_cache_entries", "Series held in the range cache", collect=lambda: len(range_cache._entries))
+Gauge("range_cache_bytes", "Estimated range cache footprint", collect=lambda: range_cache._bytes)
+Counter("range_cache_lookups_total", "Range cache lookups by result", ("result",),
+        collect=lambda: {("hit",): range_cache.hits, ("miss",): range_cache.misses})
+Counter("range_cache_invalidations_total", "Range cache entries evicted by writes", collect=lambda: range_cache.invalidations)
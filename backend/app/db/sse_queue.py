@@ -1,4 +0,0 @@
-import asyncio
-
-
-sse_queue = asyncio.Queue()
\ No newline at end of file
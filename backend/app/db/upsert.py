@@ -0,0 +1,67 @@
+import os
+from typing import List
+
+from dotenv import load_dotenv
+from sqlalchemy import column, select, table, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+load_dotenv()
+
+# Rows per INSERT ... ON CONFLICT statement; keeps SQLite under its bound-parameter limit
+UPSERT_BATCH_SIZE = int(os.getenv("UPSERT_BATCH_SIZE", "500"))
+# PostgreSQL batches at least this large are COPYed into a staging table and merged in one statement
+PG_COPY_MIN_ROWS = int(os.getenv("PG_COPY_MIN_ROWS", "1000"))
+
+_DIALECT_INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+async def upsert_rows(
+    session: AsyncSession,
+    model,
+    rows: List[dict],
+    index_elements: List[str],
+    update_columns: List[str]
+) -> None:
+    """Insert rows, updating `update_columns` where `index_elements` conflict, using the session's dialect; the caller commits"""
+    if not rows:
+        return
+    # One entry per backend database.py accepts
+    dialect = session.bind.dialect.name
+    if dialect == "postgresql" and len(rows) >= PG_COPY_MIN_ROWS:
+        await _copy_and_merge(session, model.__table__, rows, index_elements, update_columns)
+        return
+    for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+        stmt = _DIALECT_INSERTS[dialect](model).values(rows[i:i + UPSERT_BATCH_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={c: stmt.excluded[c] for c in update_columns},
+        )
+        await session.execute(stmt)
+
+
+async def _copy_and_merge(session: AsyncSession, target, rows: List[dict], index_elements: List[str], update_columns: List[str]) -> None:
+    """COPY rows into a temporary staging table over asyncpg, then merge with one INSERT ... SELECT ... ON CONFLICT"""
+    columns = list(rows[0])
+    staging = f"staging_{target.name}"
+    quote = session.bind.dialect.identifier_preparer.quote
+    column_list = ", ".join(quote(c) for c in columns)
+    # Column types only: no constraints, defaults or sequence to touch. Rolled back with the transaction on error.
+    await session.execute(text(
+        f"CREATE TEMP TABLE {quote(staging)} AS "
+        f"SELECT {column_list} FROM {quote(target.name)} WITH NO DATA"
+    ))
+    connection = await session.connection()
+    raw = await connection.get_raw_connection()
+    # Same connection and transaction the session is using
+    await raw.driver_connection.copy_records_to_table(
+        staging, records=[tuple(r[c] for c in columns) for r in rows], columns=columns
+    )
+    source = table(staging, *[column(c) for c in columns])
+    stmt = postgresql.insert(target).from_select(columns, select(*source.columns))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={c: stmt.excluded[c] for c in update_columns},
+    )
+    await session.execute(stmt)
+    await session.execute(text(f"DROP TABLE {quote(staging)}"))
@@ -0,0 +1,15 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# pg_advisory_xact_lock key shared by every transaction that writes readings, their change log or coverage runs
+READINGS_WRITE_LOCK_KEY = 0x69676C75  # "iglu"
+
+
+async def lock_reading_writes(session: AsyncSession) -> None:
+    """Serialize reading writers until the session's transaction ends; call before the first read it depends on.
+
+    Read-modify-write steps (change detection, coverage runs) then see every earlier commit, and change-log
+    seqs are assigned in commit order. SQLite needs nothing: it already allows a single writer at a time.
+    """
+    if session.bind.dialect.name == "postgresql":
+        await session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": READINGS_WRITE_LOCK_KEY})
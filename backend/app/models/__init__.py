@@ -1,4 +1,8 @@
 from .api_user import ApiUser
+from .glucose_alert import GlucoseAlert
+from .glucose_coverage_run import GlucoseCoverageRun
 from .glucose_reading import GlucoseReading
+from .glucose_reading_change import GlucoseReadingChange
+from .maintenance_step import MaintenanceStep
 
-__all__ = ["GlucoseReading", "ApiUser"]
+__all__ = ["GlucoseReading", "GlucoseReadingChange", "GlucoseAlert", "GlucoseCoverageRun", "MaintenanceStep", "ApiUser"]
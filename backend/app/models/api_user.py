@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, Integer, String
+from sqlalchemy import Boolean, Column, DateTime, Float, Integer, String
 from sqlalchemy.sql import func
 
 from app.db.database import Base
@@ -12,5 +12,11 @@ class ApiUser(Base):
     email = Column(String, nullable=False)
     api_key = Column(String, nullable=False, unique=True)
     is_active = Column(Boolean, server_default="1", nullable=False)
+    is_admin = Column(Boolean, server_default="0", nullable=False)
+    # Per-key rate limits; NULL uses the RATE_LIMIT_* defaults
+    read_rate_per_minute = Column(Float, nullable=True)
+    read_burst = Column(Integer, nullable=True)
+    expensive_rate_per_minute = Column(Float, nullable=True)
+    expensive_burst = Column(Integer, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
\ No newline at end of file
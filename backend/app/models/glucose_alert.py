@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Float, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class GlucoseAlert(Base):
+    __tablename__ = "glucose_alerts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    rule = Column(String, nullable=False)
+    value = Column(Float, nullable=False)
+    timestamp = Column(Integer, nullable=False, index=True)  # reading that fired the alert
+    message = Column(String, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
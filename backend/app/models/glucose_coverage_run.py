@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer
+
+from app.db.database import Base
+
+
+class GlucoseCoverageRun(Base):
+    """Contiguous run of readings with no spacing wider than COVERAGE_MAX_GAP_SECONDS; runs never overlap."""
+    __tablename__ = "glucose_coverage_runs"
+
+    id = Column(Integer, primary_key=True)
+    start_ts = Column(Integer, nullable=False, unique=True, index=True)  # first reading in the run
+    end_ts = Column(Integer, nullable=False, index=True)  # last reading in the run
@@ -1,11 +1,14 @@
-from sqlalchemy import Column, Integer, Float, DateTime, String
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, Float, DateTime, Index, SmallInteger, String
 from app.db.database import Base
 
 class GlucoseReading(Base):
     __tablename__ = "glucose_readings"
+    # Day/week stats and AGP filter on a local_day range and read only these columns, so the index covers them
+    __table_args__ = (Index("ix_glucose_readings_local_calendar", "local_day", "local_minute", "value"),)
     
     id = Column(Integer, primary_key=True, index=True)
     value = Column(Float, nullable=False)
-    timestamp = Column(Integer, server_default=func.now(), unique=True, index=True)
-    
\ No newline at end of file
+    timestamp = Column(Integer, unique=True, index=True)
+    # Calendar keys in LOCAL_TIMEZONE, computed at ingest: days since 1970-01-01 and minutes since local midnight
+    local_day = Column(Integer)
+    local_minute = Column(SmallInteger)
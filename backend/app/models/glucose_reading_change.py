@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, Float, Integer, String
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class GlucoseReadingChange(Base):
+    """Append-only log of reading inserts, updates and deletes, ordered by `seq`."""
+    __tablename__ = "glucose_reading_changes"
+    # AUTOINCREMENT guarantees sequence numbers are never reused
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    op = Column(String, nullable=False)  # insert, update or delete
+    timestamp = Column(Integer, nullable=False)
+    value = Column(Float, nullable=True)  # None for deletes
+    changed_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.sql import func
+
+from app.db.database import Base
+
+
+class MaintenanceStep(Base):
+    """Marker for a one-off data step (e.g. a re-stamp) that must never run twice against the same database."""
+    __tablename__ = "maintenance_steps"
+
+    name = Column(String, primary_key=True)
+    detail = Column(String, nullable=False)  # JSON parameters the step ran with
+    applied_at = Column(DateTime, server_default=func.now())
@@ -0,0 +1,47 @@
+from typing import Dict, List, Optional
+
+from app.models.glucose_alert import GlucoseAlert
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def insert_alerts(
+    session: AsyncSession,
+    alerts: List[dict]
+) -> None:
+    if not alerts:
+        return
+    await session.execute(insert(GlucoseAlert), alerts)
+    await session.commit()
+
+async def fetch_alerts(
+    session: AsyncSession,
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+    limit: int = 100,
+) -> List[GlucoseAlert]:
+    stmt = select(GlucoseAlert)
+    if from_ts is not None:
+        stmt = stmt.filter(GlucoseAlert.timestamp >= from_ts)
+    if to_ts is not None:
+        stmt = stmt.filter(GlucoseAlert.timestamp <= to_ts)
+    stmt = stmt.order_by(GlucoseAlert.timestamp.desc()).limit(limit)
+    result = await session.execute(stmt)
+    return result.scalars().all()
+
+async def move_alerts(
+    session: AsyncSession,
+    moves: Dict[int, int]
+) -> int:
+    """Re-point alerts at the new timestamps of their readings; the caller commits"""
+    if not moves:
+        return 0
+    stmt = select(GlucoseAlert.id, GlucoseAlert.timestamp).where(
+        GlucoseAlert.timestamp >= min(moves),
+        GlucoseAlert.timestamp <= max(moves),
+    )
+    updates = [{"id": i, "timestamp": moves[t]} for i, t in (await session.execute(stmt)).all() if t in moves]
+    if updates:
+        # Bulk UPDATE by primary key
+        await session.execute(update(GlucoseAlert), updates)
+    return len(updates)
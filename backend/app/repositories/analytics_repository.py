@@ -0,0 +1,68 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+from app.core.local_time import day_span, local_keys
+from app.core.metrics import DB_OPERATION_SECONDS, timed
+from app.models.glucose_reading import GlucoseReading as GlucoseReadingModel
+from app.repositories import archive_repository
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@timed(DB_OPERATION_SECONDS)
+async def fetch_columns(
+    session: AsyncSession,
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+) -> Tuple[List[int], List[float]]:
+    """Return (timestamps, values) in ascending order from live rows and archive segments, without ORM hydration"""
+    stmt = select(GlucoseReadingModel.timestamp, GlucoseReadingModel.value)
+    if from_ts is not None:
+        stmt = stmt.where(GlucoseReadingModel.timestamp >= from_ts)
+    if to_ts is not None:
+        stmt = stmt.where(GlucoseReadingModel.timestamp <= to_ts)
+    result = await session.execute(stmt.order_by(GlucoseReadingModel.timestamp.asc()))
+    rows = result.all()
+    segments = archive_repository.segments_for_range(from_ts, to_ts)
+    if not segments:
+        return [r[0] for r in rows], [r[1] for r in rows]
+    merged = await asyncio.to_thread(archive_repository.read_segment_columns, segments, from_ts, to_ts)
+    merged.update(rows)
+    timestamps = sorted(merged)
+    return timestamps, [merged[t] for t in timestamps]
+
+
+@timed(DB_OPERATION_SECONDS)
+async def fetch_local_columns(
+    session: AsyncSession,
+    key: str,
+    from_day: Optional[int] = None,
+    to_day: Optional[int] = None,
+) -> Tuple[List[int], List[float]]:
+    """Return (keys, values) for local days from_day..to_day in day order, where key is "local_day" or "local_minute".
+
+    Live rows come from a range scan of the covering local calendar index.
+    """
+    day = GlucoseReadingModel.local_day
+    from_ts, to_ts = day_span(from_day, to_day)
+    segments = archive_repository.segments_for_range(from_ts, to_ts)
+    columns = [getattr(GlucoseReadingModel, key), GlucoseReadingModel.value]
+    if segments:
+        # Only needed to let live rows win over archived copies
+        columns.append(GlucoseReadingModel.timestamp)
+    stmt = select(*columns)
+    if from_day is not None:
+        stmt = stmt.where(day >= from_day)
+    if to_day is not None:
+        stmt = stmt.where(day <= to_day)
+    result = await session.execute(stmt.order_by(day.asc()))
+    rows = result.all()
+    if not segments:
+        return [r[0] for r in rows], [r[1] for r in rows]
+    # Archive segments predate the key columns; compute keys for archived rows only
+    archived = await asyncio.to_thread(archive_repository.read_segment_columns, segments, from_ts, to_ts)
+    index = 0 if key == "local_day" else 1
+    merged = {t: (local_keys(t)[index], v) for t, v in archived.items()}
+    merged.update((t, (k, v)) for k, v, t in rows)
+    timestamps = sorted(merged)
+    return [merged[t][0] for t in timestamps], [merged[t][1] for t in timestamps]
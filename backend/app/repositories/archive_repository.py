@@ -0,0 +1,189 @@
+import json
+import os
+from typing import Callable, List, Optional
+
+from app.models.glucose_reading import GlucoseReading as GlucoseReadingModel
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Directory holding the monthly Parquet segments and their manifest
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "./archive")
+MANIFEST_FILE = "manifest.json"
+SEGMENT_COMPRESSION = os.getenv("ARCHIVE_COMPRESSION", "zstd")
+
+_manifest_cache: dict = {"mtime": None, "segments": []}
+
+
+def _manifest_path() -> str:
+    return os.path.join(ARCHIVE_DIR, MANIFEST_FILE)
+
+
+def load_manifest() -> List[dict]:
+    """Return archived segments, re-reading the manifest only when it changed on disk."""
+    path = _manifest_path()
+    if not os.path.exists(path):
+        return []
+    mtime = os.path.getmtime(path)
+    if _manifest_cache["mtime"] != mtime:
+        with open(path) as f:
+            _manifest_cache["segments"] = json.load(f).get("segments", [])
+        _manifest_cache["mtime"] = mtime
+    return _manifest_cache["segments"]
+
+
+def save_manifest(segments: List[dict]) -> None:
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    path = _manifest_path()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"segments": sorted(segments, key=lambda s: s["min_ts"])}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def segments_for_range(
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+) -> List[dict]:
+    """Return the segments whose timestamp range overlaps [from_ts, to_ts]."""
+    return [
+        s for s in load_manifest()
+        if (from_ts is None or s["max_ts"] >= from_ts)
+        and (to_ts is None or s["min_ts"] <= to_ts)
+    ]
+
+
+def read_segments(
+    segments: List[dict],
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+) -> List[GlucoseReadingModel]:
+    """Read archived rows in range as detached models. Blocking, run it in a thread."""
+    import pyarrow.parquet as pq
+
+    filters = []
+    if from_ts is not None:
+        filters.append(("timestamp", ">=", from_ts))
+    if to_ts is not None:
+        filters.append(("timestamp", "<=", to_ts))
+    readings = []
+    for segment in segments:
+        table = pq.read_table(
+            os.path.join(ARCHIVE_DIR, segment["path"]),
+            columns=["id", "value", "timestamp"],
+            filters=filters or None,
+        )
+        columns = table.to_pydict()
+        readings.extend(
+            GlucoseReadingModel(id=i, value=v, timestamp=t)
+            for i, v, t in zip(columns["id"], columns["value"], columns["timestamp"])
+        )
+    return readings
+
+
+def read_ranges(ranges: List[tuple]) -> List[GlucoseReadingModel]:
+    """Read archived rows inside any of the inclusive (from_ts, to_ts) ranges. Blocking, run it in a thread."""
+    readings = []
+    for from_ts, to_ts in ranges:
+        segments = segments_for_range(from_ts, to_ts)
+        if segments:
+            readings.extend(read_segments(segments, from_ts, to_ts))
+    return readings
+
+
+def read_segment_columns(
+    segments: List[dict],
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+) -> dict:
+    """Read archived rows in range as a {timestamp: value} mapping. Blocking, run it in a thread."""
+    import pyarrow.parquet as pq
+
+    filters = []
+    if from_ts is not None:
+        filters.append(("timestamp", ">=", from_ts))
+    if to_ts is not None:
+        filters.append(("timestamp", "<=", to_ts))
+    values = {}
+    for segment in segments:
+        columns = pq.read_table(
+            os.path.join(ARCHIVE_DIR, segment["path"]),
+            columns=["value", "timestamp"],
+            filters=filters or None,
+        ).to_pydict()
+        values.update(zip(columns["timestamp"], columns["value"]))
+    return values
+
+
+def segment_paths(segments: List[dict]) -> List[str]:
+    return [os.path.join(ARCHIVE_DIR, s["path"]) for s in segments]
+
+
+def write_segment(month: str, rows: List[tuple]) -> dict:
+    """Write (id, value, timestamp) rows for a month, merging with any existing segment."""
+    import pyarrow.parquet as pq
+
+    path = f"glucose_readings/{month}.parquet"
+    full_path = os.path.join(ARCHIVE_DIR, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    merged = {}
+    if os.path.exists(full_path):
+        existing = pq.read_table(full_path).to_pydict()
+        for i, v, t in zip(existing["id"], existing["value"], existing["timestamp"]):
+            merged[t] = (i, v, t)
+    # Rows still in the live table win over previously archived copies
+    for row in rows:
+        merged[row[2]] = row
+    ordered = [merged[t] for t in sorted(merged)]
+    _write_rows(full_path, ordered)
+    return {
+        "month": month,
+        "path": path,
+        "min_ts": ordered[0][2],
+        "max_ts": ordered[-1][2],
+        "rows": len(ordered),
+    }
+
+
+def _write_rows(full_path: str, ordered: List[tuple]) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.table({
+        "id": pa.array([r[0] for r in ordered], pa.int64()),
+        "value": pa.array([r[1] for r in ordered], pa.float64()),
+        "timestamp": pa.array([r[2] for r in ordered], pa.int64()),
+    })
+    tmp_path = f"{full_path}.tmp"
+    pq.write_table(table, tmp_path, compression=SEGMENT_COMPRESSION)
+    os.replace(tmp_path, full_path)
+
+
+def restamp_segments(from_ts: int, to_ts: int, restamp: Callable[[int], int]) -> int:
+    """Rewrite archived timestamps in [from_ts, to_ts) as restamp(ts), keeping the first row per timestamp; returns rows moved.
+
+    Blocking, run it in a thread.
+    """
+    import pyarrow.parquet as pq
+
+    overlapping = {s["path"] for s in segments_for_range(from_ts, to_ts - 1)}
+    if not overlapping:
+        return 0
+    segments, moved = [], 0
+    for segment in load_manifest():
+        if segment["path"] not in overlapping:
+            segments.append(segment)
+            continue
+        full_path = os.path.join(ARCHIVE_DIR, segment["path"])
+        columns = pq.read_table(full_path).to_pydict()
+        rows = {}
+        for i, v, t in zip(columns["id"], columns["value"], columns["timestamp"]):
+            if from_ts <= t < to_ts:
+                t = restamp(t)
+                moved += 1
+            rows.setdefault(t, (i, v, t))
+        ordered = [rows[t] for t in sorted(rows)]
+        _write_rows(full_path, ordered)
+        segments.append({**segment, "min_ts": ordered[0][2], "max_ts": ordered[-1][2], "rows": len(ordered)})
+    save_manifest(segments)
+    return moved
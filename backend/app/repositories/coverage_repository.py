@@ -0,0 +1,119 @@
+import os
+from typing import Iterable, List, Optional
+
+from app.core.metrics import DB_OPERATION_SECONDS, timed
+from app.models.glucose_coverage_run import GlucoseCoverageRun
+from app.models.glucose_reading import GlucoseReading as GlucoseReadingModel
+from dotenv import load_dotenv
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+load_dotenv()
+
+# Readings further apart than this belong to different coverage runs, i.e. the span between them is a gap
+COVERAGE_MAX_GAP_SECONDS = int(os.getenv("COVERAGE_MAX_GAP_SECONDS", "300"))
+
+
+def coalesce_runs(runs: Iterable[tuple], max_gap: int = COVERAGE_MAX_GAP_SECONDS) -> List[tuple]:
+    """Merge inclusive (start_ts, end_ts) runs whose spacing is at most max_gap"""
+    merged = []
+    for lo, hi in sorted(runs):
+        if merged and lo - merged[-1][1] <= max_gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+async def _runs_overlapping(session: AsyncSession, from_ts: int, to_ts: int) -> List[GlucoseCoverageRun]:
+    stmt = (
+        select(GlucoseCoverageRun)
+        .where(GlucoseCoverageRun.end_ts >= from_ts, GlucoseCoverageRun.start_ts <= to_ts)
+        .order_by(GlucoseCoverageRun.start_ts.asc())
+    )
+    return (await session.execute(stmt)).scalars().all()
+
+
+async def _replace_runs(session: AsyncSession, old: List[GlucoseCoverageRun], new: List[tuple]) -> None:
+    if [(r.start_ts, r.end_ts) for r in old] == new:
+        return
+    if old:
+        await session.execute(delete(GlucoseCoverageRun).where(GlucoseCoverageRun.id.in_([r.id for r in old])))
+    if new:
+        await session.execute(insert(GlucoseCoverageRun), [{"start_ts": lo, "end_ts": hi} for lo, hi in new])
+
+
+async def add_to_coverage(
+    session: AsyncSession,
+    timestamps: List[int]
+) -> None:
+    """Extend, bridge or create runs for newly inserted readings; the caller holds lock_reading_writes and commits"""
+    if not timestamps:
+        return
+    old = await _runs_overlapping(session, min(timestamps) - COVERAGE_MAX_GAP_SECONDS, max(timestamps) + COVERAGE_MAX_GAP_SECONDS)
+    new = coalesce_runs([(r.start_ts, r.end_ts) for r in old] + [(t, t) for t in timestamps])
+    await _replace_runs(session, old, new)
+
+
+async def _neighbour(session: AsyncSession, ts: int, run: GlucoseCoverageRun, before: bool) -> Optional[int]:
+    column = GlucoseReadingModel.timestamp
+    if before:
+        stmt = select(func.max(column)).where(column >= run.start_ts, column < ts)
+    else:
+        stmt = select(func.min(column)).where(column > ts, column <= run.end_ts)
+    return (await session.execute(stmt)).scalar()
+
+
+async def remove_from_coverage(
+    session: AsyncSession,
+    timestamps: List[int]
+) -> None:
+    """Trim or split the runs holding deleted readings; rows must already be deleted (or flushed) in this session,
+    under lock_reading_writes.
+
+    Each hole costs two index lookups for its surviving neighbours, however many rows it spans.
+    """
+    if not timestamps:
+        return
+    deleted = sorted(timestamps)
+    for run in await _runs_overlapping(session, deleted[0], deleted[-1]):
+        pieces, start, resume = [], run.start_ts, None
+        for ts in deleted:
+            if ts < run.start_ts or ts > run.end_ts or (resume is not None and ts < resume):
+                continue
+            prev = await _neighbour(session, ts, run, before=True)
+            nxt = await _neighbour(session, ts, run, before=False)
+            if prev is not None and nxt is not None and nxt - prev <= COVERAGE_MAX_GAP_SECONDS:
+                resume = nxt
+                continue
+            if prev is not None:
+                pieces.append((start, prev))
+            if nxt is None:
+                start = None
+                break
+            start = resume = nxt
+        if start is not None:
+            pieces.append((start, run.end_ts))
+        await _replace_runs(session, [run], pieces)
+
+
+async def rebuild_coverage(
+    session: AsyncSession,
+    timestamps: Iterable[int]
+) -> int:
+    """Replace every run with runs rebuilt from all reading timestamps, live and archived; the caller holds lock_reading_writes and commits"""
+    runs = coalesce_runs((t, t) for t in timestamps)
+    await session.execute(delete(GlucoseCoverageRun))
+    if runs:
+        await session.execute(insert(GlucoseCoverageRun), [{"start_ts": lo, "end_ts": hi} for lo, hi in runs])
+    return len(runs)
+
+
+@timed(DB_OPERATION_SECONDS)
+async def fetch_runs(
+    session: AsyncSession,
+    from_ts: int,
+    to_ts: int,
+) -> List[tuple]:
+    """Ascending (start_ts, end_ts) runs overlapping [from_ts, to_ts]"""
+    return [(r.start_ts, r.end_ts) for r in await _runs_overlapping(session, from_ts, to_ts)]
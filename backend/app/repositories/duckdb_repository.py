@@ -0,0 +1,144 @@
+import os
+import threading
+from typing import List, Optional
+
+from app.core.local_time import LOCAL_TIMEZONE, day_span, day_start
+from app.db.database import SQLALCHEMY_DATABASE_URL
+from app.repositories import archive_repository
+from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
+
+load_dotenv()
+
+# Worker threads DuckDB may use per query (defaults to all cores)
+ANALYTICS_THREADS = os.getenv("ANALYTICS_THREADS")
+
+_connection = None
+_connection_lock = threading.Lock()
+
+
+def _get_connection():
+    """Lazily open an in-memory DuckDB with the SQLite file attached read-only"""
+    global _connection
+    with _connection_lock:
+        if _connection is None:
+            import duckdb
+
+            con = duckdb.connect()
+            if ANALYTICS_THREADS:
+                con.execute(f"SET threads = {int(ANALYTICS_THREADS)}")
+            db_path = make_url(SQLALCHEMY_DATABASE_URL).database
+            con.execute(f"ATTACH '{db_path}' AS live (TYPE sqlite, READ_ONLY)")
+            _connection = con
+    # A cursor is an independent connection to the same database, safe per thread
+    return _connection.cursor()
+
+
+def _range_where(column: str, from_ts: Optional[int], to_ts: Optional[int]) -> tuple:
+    conditions, params = [], []
+    if from_ts is not None:
+        conditions.append(f"{column} >= ?")
+        params.append(from_ts)
+    if to_ts is not None:
+        conditions.append(f"{column} <= ?")
+        params.append(to_ts)
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+
+def _readings_cte(from_ts: Optional[int], to_ts: Optional[int], days: Optional[tuple] = None) -> tuple:
+    """Build a `readings` CTE over live rows plus overlapping archive segments.
+
+    With `days` = (from_day, to_day), live rows are selected by their local_day key
+    and from_ts/to_ts should be the matching day_span.
+    """
+    if days is None:
+        where, params = _range_where("timestamp", from_ts, to_ts)
+    else:
+        where, params = _range_where("local_day", *days)
+    sql = f"SELECT timestamp, value, local_day, local_minute FROM live.glucose_readings {where}"
+    paths = archive_repository.segment_paths(archive_repository.segments_for_range(from_ts, to_ts))
+    if paths:
+        # Live rows win over archived copies of the same timestamp
+        # and archived rows, which predate the key columns, get their local keys computed here
+        archive_where, archive_params = _range_where("a.timestamp", from_ts, to_ts)
+        sql += f"""
+            UNION ALL
+            SELECT a.timestamp, a.value,
+                   date_diff('day', DATE '1970-01-01', CAST(a.local_ts AS DATE)),
+                   hour(a.local_ts) * 60 + minute(a.local_ts)
+            FROM (SELECT *, timezone(?, to_timestamp(timestamp)) AS local_ts FROM read_parquet(?)) a
+            ANTI JOIN live.glucose_readings l ON a.timestamp = l.timestamp
+            {archive_where}
+        """
+        params = params + [LOCAL_TIMEZONE, paths] + archive_params
+    return f"WITH readings AS ({sql})", params
+
+
+def query_summary(
+    from_ts: Optional[int],
+    to_ts: Optional[int],
+    low: float,
+    high: float,
+) -> dict:
+    cte, params = _readings_cte(from_ts, to_ts)
+    row = _get_connection().execute(f"""
+        {cte}
+        SELECT count(*), avg(value), stddev_pop(value), min(value), max(value),
+               count(*) FILTER (WHERE value < ?), count(*) FILTER (WHERE value > ?)
+        FROM readings
+    """, params + [low, high]).fetchone()
+    return dict(zip(("count", "mean", "sd", "min", "max", "below", "above"), row))
+
+
+def query_buckets(
+    from_ts: Optional[int],
+    to_ts: Optional[int],
+    interval: int,
+) -> List[dict]:
+    cte, params = _readings_cte(from_ts, to_ts)
+    rows = _get_connection().execute(f"""
+        {cte}
+        SELECT timestamp - timestamp % ? AS bucket, count(*), avg(value), min(value), max(value)
+        FROM readings
+        GROUP BY bucket
+        ORDER BY bucket
+    """, params + [interval]).fetchall()
+    return [dict(zip(("timestamp", "count", "mean", "min", "max"), r)) for r in rows]
+
+
+def query_calendar_buckets(
+    from_day: Optional[int],
+    to_day: Optional[int],
+    weekly: bool = False,
+) -> List[dict]:
+    cte, params = _readings_cte(*day_span(from_day, to_day), days=(from_day, to_day))
+    # Weeks start on Monday; local day 0 (1970-01-01) was a Thursday
+    key = "local_day - (local_day + 3) % 7" if weekly else "local_day"
+    rows = _get_connection().execute(f"""
+        {cte}
+        SELECT {key} AS bucket, count(*), avg(value), min(value), max(value)
+        FROM readings
+        GROUP BY bucket
+        ORDER BY bucket
+    """, params).fetchall()
+    return [dict(zip(("timestamp", "count", "mean", "min", "max"), (day_start(r[0]),) + r[1:])) for r in rows]
+
+
+def query_agp(
+    from_day: Optional[int],
+    to_day: Optional[int],
+    bin_minutes: int,
+) -> List[dict]:
+    cte, params = _readings_cte(*day_span(from_day, to_day), days=(from_day, to_day))
+    rows = _get_connection().execute(f"""
+        {cte}
+        SELECT local_minute // ? * ? AS minute, count(*),
+               quantile_cont(value, [0.05, 0.25, 0.5, 0.75, 0.95])
+        FROM readings
+        GROUP BY minute
+        ORDER BY minute
+    """, params + [bin_minutes, bin_minutes]).fetchall()
+    return [
+        dict(minute=minute, count=count, p5=q[0], p25=q[1], p50=q[2], p75=q[3], p95=q[4])
+        for minute, count, q in rows
+    ]
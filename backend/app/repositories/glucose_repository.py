@@ -1,10 +1,20 @@
-from typing import List, Optional
+import asyncio
+from typing import Dict, List, Optional
 
+from app.core.local_time import with_local_keys
+from app.core.metrics import DB_OPERATION_SECONDS, timed
+from app.db.range_cache import range_cache
+from app.db.upsert import UPSERT_BATCH_SIZE, upsert_rows
+from app.db.write_lock import lock_reading_writes
 from app.models.glucose_reading import GlucoseReading as GlucoseReadingModel
-from sqlalchemy import select
+from app.models.glucose_reading_change import GlucoseReadingChange
+from app.repositories import archive_repository
+from app.repositories.coverage_repository import add_to_coverage, remove_from_coverage
+from sqlalchemy import delete, func, insert, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
+@timed(DB_OPERATION_SECONDS)
 async def fetch_readings(
     session: AsyncSession,
     from_ts: Optional[int] = None,
@@ -12,6 +22,27 @@ async def fetch_readings(
     skip: int = 0,
     limit: Optional[int] = None,
     order: Optional[str] = "asc",
+) -> List[GlucoseReadingModel]:
+    """Fetch readings from the live table and any archive segments overlapping the range"""
+    segments = archive_repository.segments_for_range(from_ts, to_ts)
+    if not segments:
+        return await fetch_live_readings(session, from_ts, to_ts, skip, limit, order)
+    archived = await asyncio.to_thread(archive_repository.read_segments, segments, from_ts, to_ts)
+    window = None if limit is None else skip + limit
+    live = await fetch_live_readings(session, from_ts, to_ts, 0, window, order)
+    merged = {r.timestamp: r for r in archived}
+    merged.update((r.timestamp, r) for r in live)
+    readings = sorted(merged.values(), key=lambda r: r.timestamp, reverse=order == "desc")
+    return readings[skip:window]
+
+@timed(DB_OPERATION_SECONDS)
+async def fetch_live_readings(
+    session: AsyncSession,
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    order: Optional[str] = "asc",
 ) -> List[GlucoseReadingModel]:
     stmt = select(GlucoseReadingModel)
     if from_ts is not None:
@@ -28,6 +59,7 @@ async def fetch_readings(
     result = await session.execute(stmt)
     return result.scalars().all()
 
+@timed(DB_OPERATION_SECONDS)
 async def fetch_latest(
     session: AsyncSession
 ) -> Optional[GlucoseReadingModel]:
@@ -35,29 +67,216 @@ async def fetch_latest(
     result = await session.execute(stmt)
     return result.scalars().first()
 
+@timed(DB_OPERATION_SECONDS)
 async def upsert_readings(
     session: AsyncSession,
     readings_data: List[dict]
-) -> None:
-    from sqlalchemy.dialects.sqlite import insert as sqlite_insert
-    stmt = sqlite_insert(GlucoseReadingModel).values(readings_data)
-    stmt = stmt.on_conflict_do_update(
-        index_elements=["timestamp"],
-        set_={"value": stmt.excluded["value"]}
+) -> List[dict]:
+    """Insert or update readings, skipping unchanged values and recording the rest in the change log; returns the changes"""
+    if not readings_data:
+        return []
+    await lock_reading_writes(session)
+    incoming = {r["timestamp"]: r["value"] for r in readings_data}
+    stmt = select(GlucoseReadingModel.timestamp, GlucoseReadingModel.value).where(
+        GlucoseReadingModel.timestamp >= min(incoming),
+        GlucoseReadingModel.timestamp <= max(incoming),
+    )
+    existing = dict((await session.execute(stmt)).all())
+    changes = []
+    for ts, value in incoming.items():
+        if ts not in existing:
+            changes.append({"op": "insert", "timestamp": ts, "value": value})
+        elif existing[ts] != value:
+            changes.append({"op": "update", "timestamp": ts, "value": value})
+    if not changes:
+        return changes
+    # The write lock keeps the read above current; ON CONFLICT keeps the statement safe regardless
+    await upsert_rows(
+        session, GlucoseReadingModel,
+        with_local_keys([{"value": c["value"], "timestamp": c["timestamp"]} for c in changes]),
+        ["timestamp"], ["value", "local_day", "local_minute"],
     )
-    await session.execute(stmt)
+    await session.execute(insert(GlucoseReadingChange), changes)
+    await add_to_coverage(session, [c["timestamp"] for c in changes if c["op"] == "insert"])
     await session.commit()
+    range_cache.invalidate(c["timestamp"] for c in changes)
+    return changes
 
+@timed(DB_OPERATION_SECONDS)
 async def delete_readings(
     session: AsyncSession,
     ids: Optional[List[int]] = None,
     from_ts: Optional[int] = None,
     to_ts: Optional[int] = None,
 ) -> List[GlucoseReadingModel]:
-    query = await fetch_readings(session, from_ts, to_ts)
+    # Archived segments are immutable; only live rows can be deleted
+    await lock_reading_writes(session)
+    query = await fetch_live_readings(session, from_ts, to_ts)
     if ids:
         query = [r for r in query if r.id in ids]
+    if not query:
+        return query
     for r in query:
         await session.delete(r)
+    await session.execute(
+        insert(GlucoseReadingChange),
+        [{"op": "delete", "timestamp": r.timestamp, "value": None} for r in query],
+    )
+    await session.flush()
+    await remove_from_coverage(session, [r.timestamp for r in query])
+    await session.commit()
+    range_cache.invalidate(r.timestamp for r in query)
+    return query
+
+@timed(DB_OPERATION_SECONDS)
+async def replace_range(
+    session: AsyncSession,
+    from_ts: int,
+    to_ts: int,
+    readings_data: List[dict]
+) -> None:
+    """Atomically replace live rows in [from_ts, to_ts) with readings_data, logging the net changes"""
+    await lock_reading_writes(session)
+    old = dict((t, v) for _, v, t in await fetch_rows_in_range(session, from_ts, to_ts))
+    new = {r["timestamp"]: r["value"] for r in readings_data}
+    changes = [{"op": "delete", "timestamp": t, "value": None} for t in old if t not in new]
+    for t, v in new.items():
+        if t not in old:
+            changes.append({"op": "insert", "timestamp": t, "value": v})
+        elif old[t] != v:
+            changes.append({"op": "update", "timestamp": t, "value": v})
+    await session.execute(delete(GlucoseReadingModel).where(
+        GlucoseReadingModel.timestamp >= from_ts,
+        GlucoseReadingModel.timestamp < to_ts,
+    ))
+    if readings_data:
+        await session.execute(insert(GlucoseReadingModel), with_local_keys(readings_data))
+    if changes:
+        await session.execute(insert(GlucoseReadingChange), changes)
+        await remove_from_coverage(session, [c["timestamp"] for c in changes if c["op"] == "delete"])
+        await add_to_coverage(session, [c["timestamp"] for c in changes if c["op"] == "insert"])
+    await session.commit()
+    range_cache.invalidate_range(from_ts, to_ts - 1)
+
+@timed(DB_OPERATION_SECONDS)
+async def move_readings(
+    session: AsyncSession,
+    moves: Dict[int, int]
+) -> List[dict]:
+    """Move live readings from old to new timestamps, logged as a delete plus an insert each (new seqs); returns the changes.
+
+    A reading whose new timestamp is already taken, by a reading that stays put or an earlier move, is dropped.
+    """
+    if not moves:
+        return []
+    await lock_reading_writes(session)
+    old = {t: v for _, v, t in await fetch_rows_in_range(session, min(moves), max(moves) + 1) if t in moves}
+    if not old:
+        return []
+    targets = [moves[t] for t in old]
+    occupied = {t for _, _, t in await fetch_rows_in_range(session, min(targets), max(targets) + 1) if t not in old}
+    new = {}
+    for t in sorted(old):
+        if moves[t] not in occupied and moves[t] not in new:
+            new[moves[t]] = old[t]
+    # All deletes first, so a client replaying the log never drops a moved reading that landed on an old timestamp
+    changes = [{"op": "delete", "timestamp": t, "value": None} for t in sorted(old)]
+    changes += [{"op": "insert", "timestamp": t, "value": v} for t, v in sorted(new.items())]
+    deleted = sorted(old)
+    for i in range(0, len(deleted), UPSERT_BATCH_SIZE):
+        await session.execute(delete(GlucoseReadingModel).where(GlucoseReadingModel.timestamp.in_(deleted[i:i + UPSERT_BATCH_SIZE])))
+    await remove_from_coverage(session, deleted)
+    if new:
+        await session.execute(insert(GlucoseReadingModel), with_local_keys([{"value": v, "timestamp": t} for t, v in new.items()]))
+    await session.execute(insert(GlucoseReadingChange), changes)
+    await add_to_coverage(session, list(new))
+    await session.commit()
+    range_cache.invalidate(deleted + list(new))
+    return changes
+
+@timed(DB_OPERATION_SECONDS)
+async def fetch_changes(
+    session: AsyncSession,
+    since: int = 0,
+    limit: int = 1000,
+) -> List[GlucoseReadingChange]:
+    stmt = (
+        select(GlucoseReadingChange)
+        .where(GlucoseReadingChange.seq > since)
+        .order_by(GlucoseReadingChange.seq.asc())
+        .limit(limit)
+    )
+    result = await session.execute(stmt)
+    return result.scalars().all()
+
+def merge_ranges(ranges: List[tuple]) -> List[tuple]:
+    """Coalesce overlapping or touching inclusive (from_ts, to_ts) ranges"""
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+@timed(DB_OPERATION_SECONDS)
+async def fetch_rows_in_windows(
+    session: AsyncSession,
+    ranges: List[tuple],
+) -> List[tuple]:
+    """Return ascending (id, value, timestamp) rows inside any inclusive range, using one combined scan"""
+    merged = merge_ranges(ranges)
+    if not merged:
+        return []
+    ts = GlucoseReadingModel.timestamp
+    stmt = (
+        select(GlucoseReadingModel.id, GlucoseReadingModel.value, ts)
+        .where(or_(*[ts.between(lo, hi) for lo, hi in merged]))
+        .order_by(ts.asc())
+    )
+    rows = [tuple(r) for r in (await session.execute(stmt)).all()]
+    if not any(archive_repository.segments_for_range(lo, hi) for lo, hi in merged):
+        return rows
+    archived = await asyncio.to_thread(archive_repository.read_ranges, merged)
+    by_ts = {r.timestamp: (r.id, r.value, r.timestamp) for r in archived}
+    by_ts.update((r[2], r) for r in rows)
+    return [by_ts[t] for t in sorted(by_ts)]
+
+@timed(DB_OPERATION_SECONDS)
+async def fetch_oldest_timestamp(
+    session: AsyncSession
+) -> Optional[int]:
+    result = await session.execute(select(func.min(GlucoseReadingModel.timestamp)))
+    return result.scalar()
+
+@timed(DB_OPERATION_SECONDS)
+async def fetch_rows_in_range(
+    session: AsyncSession,
+    from_ts: int,
+    to_ts: int,
+) -> List[tuple]:
+    """Return (id, value, timestamp) tuples for [from_ts, to_ts) without hydrating models"""
+    stmt = (
+        select(GlucoseReadingModel.id, GlucoseReadingModel.value, GlucoseReadingModel.timestamp)
+        .where(GlucoseReadingModel.timestamp >= from_ts, GlucoseReadingModel.timestamp < to_ts)
+        .order_by(GlucoseReadingModel.timestamp.asc())
+    )
+    result = await session.execute(stmt)
+    return [tuple(r) for r in result.all()]
+
+@timed(DB_OPERATION_SECONDS)
+async def delete_range(
+    session: AsyncSession,
+    from_ts: int,
+    to_ts: int,
+) -> int:
+    """Bulk delete rows in [from_ts, to_ts); physical maintenance (archival), not recorded in the change log or coverage"""
+    await lock_reading_writes(session)
+    stmt = delete(GlucoseReadingModel).where(
+        GlucoseReadingModel.timestamp >= from_ts,
+        GlucoseReadingModel.timestamp < to_ts,
+    )
+    result = await session.execute(stmt)
     await session.commit()
-    return query
\ No newline at end of file
+    range_cache.invalidate_range(from_ts, to_ts - 1)
+    return result.rowcount
@@ -0,0 +1,21 @@
+from typing import Optional
+
+from app.models.maintenance_step import MaintenanceStep
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def fetch_step(
+    session: AsyncSession,
+    name: str
+) -> Optional[MaintenanceStep]:
+    result = await session.execute(select(MaintenanceStep).where(MaintenanceStep.name == name))
+    return result.scalars().first()
+
+async def record_step(
+    session: AsyncSession,
+    name: str,
+    detail: str
+) -> None:
+    """Mark a step as applied; the caller commits it together with the step's own writes"""
+    await session.execute(insert(MaintenanceStep), [{"name": name, "detail": detail}])
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ExportJobCreate(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    format: str = Field("csv", description="Export format (json, csv, html)")
+    from_ts: Optional[int] = Field(None, alias="from", description="Epoch start timestamp (inclusive)")
+    to_ts: Optional[int] = Field(None, alias="to", description="Epoch end timestamp (inclusive)")
+    skip: int = Field(0, description="Skip the first n readings")
+    limit: Optional[int] = Field(None, description="Limit the number of readings to export")
+    granularity: str = Field("all", description="Granularity of readings (all, 1m, 1h, 1d)")
+
+class ExportJobStatus(BaseModel):
+    id: str
+    status: str = Field(..., description="pending, running, completed or failed")
+    progress: float = Field(..., description="Fraction of the export completed (0-1)")
+    format: str
+    created_at: float = Field(..., description="Submission time in seconds since epoch")
+    finished_at: Optional[float] = None
+    expires_at: Optional[float] = Field(None, description="When the artifact will be deleted")
+    size: Optional[int] = Field(None, description="Artifact size in bytes")
+    error: Optional[str] = None
@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class GlucoseAlert(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    rule: str = Field(..., description="Rule that fired: urgent_low, low, high or rate_of_change")
+    value: float = Field(..., description="Glucose value in mmol/L of the reading that fired the alert")
+    timestamp: int = Field(..., description="Timestamp of the reading that fired the alert in seconds since epoch")
+    message: str
+    created_at: Optional[datetime] = None
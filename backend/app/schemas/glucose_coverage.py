@@ -0,0 +1,23 @@
+from typing import List
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class CoverageInterval(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    from_ts: int = Field(..., alias="from", description="Epoch start timestamp")
+    to_ts: int = Field(..., alias="to", description="Epoch end timestamp")
+    seconds: int
+
+class GlucoseCoverage(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    from_ts: int = Field(..., alias="from", description="Epoch start timestamp of the requested range")
+    to_ts: int = Field(..., alias="to", description="Epoch end timestamp of the requested range")
+    max_gap_seconds: int = Field(..., description="Spacing between readings above which the span counts as missing")
+    covered_seconds: int
+    missing_seconds: int
+    coverage_percent: float = Field(..., description="Percent of the range with sensor data (sensor wear)")
+    runs: List[CoverageInterval] = Field(..., description="Contiguous runs of readings, clipped to the range")
+    gaps: List[CoverageInterval] = Field(..., description="Missing intervals, including at either end of the range")
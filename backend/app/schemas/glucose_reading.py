@@ -1,4 +1,6 @@
-from pydantic import BaseModel, Field
+from typing import List, NamedTuple, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class GlucoseReadingBase(BaseModel):
@@ -20,4 +22,41 @@ class RemoteReading(BaseModel):
     timestamp: int = Field(..., description="Epoch timestamp in seconds")
     
 class GlucoseReadingResponse(GlucoseReadingBase):
-    ...
\ No newline at end of file
+    ...
+
+class GlucoseReadingChange(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    seq: int = Field(..., description="Monotonically increasing change sequence number")
+    op: str = Field(..., description="insert, update or delete")
+    timestamp: int = Field(..., description="Timestamp of the affected reading in seconds since epoch")
+    value: Optional[float] = Field(None, description="New value; null for deletes")
+
+class GlucoseReadingChanges(BaseModel):
+    changes: List[GlucoseReadingChange]
+    last_seq: int = Field(..., description="Pass as `since` on the next call")
+    has_more: bool = Field(..., description="More changes are available after last_seq")
+
+class ReadingWindow(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    from_ts: int = Field(..., alias="from", description="Epoch start timestamp (inclusive)")
+    to_ts: int = Field(..., alias="to", description="Epoch end timestamp (inclusive)")
+    granularity: str = Field("1m", description="Granularity of readings (all, 1m, 1h, 1d)")
+
+class ReadingWindowsRequest(BaseModel):
+    windows: List[ReadingWindow] = Field(..., min_length=1, max_length=100)
+
+class WindowReading(BaseModel):
+    offset: int = Field(..., description="Seconds since the start of the window")
+    value: float
+    timestamp: int
+
+class WindowSeries(ReadingWindow):
+    readings: List[WindowReading]
+
+class ReadingRow(NamedTuple):
+    """Lightweight immutable reading used for computed and cached series."""
+    id: int
+    value: float
+    timestamp: int
@@ -0,0 +1,36 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class GlucoseSummary(BaseModel):
+    count: int = Field(..., description="Number of readings in range")
+    mean: Optional[float] = Field(None, description="Mean glucose in mmol/L")
+    sd: Optional[float] = Field(None, description="Population standard deviation in mmol/L")
+    min: Optional[float] = None
+    max: Optional[float] = None
+    cv: Optional[float] = Field(None, description="Coefficient of variation in percent")
+    gmi: Optional[float] = Field(None, description="Glucose management indicator in percent")
+    time_below_range: Optional[float] = Field(None, description="Percent of readings below 3.9 mmol/L")
+    time_in_range: Optional[float] = Field(None, description="Percent of readings within 3.9-10.0 mmol/L")
+    time_above_range: Optional[float] = Field(None, description="Percent of readings above 10.0 mmol/L")
+
+class GlucoseBucket(BaseModel):
+    timestamp: int = Field(..., description="Bucket start in seconds since epoch")
+    count: int
+    mean: float
+    min: float
+    max: float
+
+class GlucoseStatsResponse(BaseModel):
+    summary: GlucoseSummary
+    buckets: List[GlucoseBucket]
+
+class AgpBin(BaseModel):
+    minute: int = Field(..., description="Start of the time-of-day bin in minutes after local midnight")
+    count: int
+    p5: float
+    p25: float
+    p50: float
+    p75: float
+    p95: float
@@ -0,0 +1,17 @@
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class SlowQuery(BaseModel):
+    sql: str = Field(..., description="Normalized SQL: literals and expanded IN lists folded to placeholders")
+    count: int = Field(..., description="Executions above the threshold")
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    last_ms: float
+    last_params: str = Field(..., description="Types of the last bound parameters, never their values")
+    last_rowcount: Optional[int] = Field(None, description="Rows affected as reported by the driver; null for SELECT")
+    last_seen: float = Field(..., description="Unix time of the last slow execution")
+    endpoints: Dict[str, int] = Field(..., description="Slow executions per calling endpoint")
+    plan: Optional[List[str]] = Field(None, description="EXPLAIN QUERY PLAN captured on first sight (SQLite)")
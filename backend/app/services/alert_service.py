@@ -0,0 +1,150 @@
+import os
+import time
+from typing import List, Optional
+
+from app.core.metrics import ALERTS_FIRED
+from app.db.event_hub import event_hub
+from app.repositories.alert_repository import fetch_alerts, insert_alerts
+from dotenv import load_dotenv
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+load_dotenv()
+
+ALERT_LOW_THRESHOLD = float(os.getenv("ALERT_LOW_THRESHOLD", "3.9"))
+ALERT_LOW_MINUTES = int(os.getenv("ALERT_LOW_MINUTES", "15"))
+ALERT_URGENT_LOW_THRESHOLD = float(os.getenv("ALERT_URGENT_LOW_THRESHOLD", "3.0"))
+ALERT_HIGH_THRESHOLD = float(os.getenv("ALERT_HIGH_THRESHOLD", "10.0"))
+ALERT_HIGH_MINUTES = int(os.getenv("ALERT_HIGH_MINUTES", "30"))
+# mmol/L per minute; 0.17 is roughly 3 mg/dL/min
+ALERT_ROC_THRESHOLD = float(os.getenv("ALERT_ROC_THRESHOLD", "0.17"))
+ALERT_ROC_ALPHA = float(os.getenv("ALERT_ROC_ALPHA", "0.3"))
+# Readings further apart than this are treated as a sensor gap: rule state doesn't carry across it
+RULE_MAX_GAP_SECONDS = 15 * 60
+# Readings older than this still update rule state but never fire (e.g. backfill after a restart)
+ALERT_MAX_AGE_SECONDS = int(os.getenv("ALERT_MAX_AGE_SECONDS", "900"))
+# Readings stamped further than this past now are ignored, so a bad clock or input can't mask live readings
+ALERT_MAX_SKEW_SECONDS = int(os.getenv("ALERT_MAX_SKEW_SECONDS", "300"))
+
+
+class ThresholdRule:
+    """Fires once when readings stay below (or above) a threshold for at least `minutes`; re-arms when they recover."""
+
+    def __init__(self, name: str, threshold: float, minutes: int, below: bool):
+        self.name = name
+        self.threshold = threshold
+        self.duration = minutes * 60
+        self.below = below
+        self.since: Optional[int] = None
+        self.last_timestamp: Optional[int] = None
+        self.fired = False
+
+    def update(self, value: float, timestamp: int) -> Optional[str]:
+        breached = value < self.threshold if self.below else value > self.threshold
+        last_timestamp, self.last_timestamp = self.last_timestamp, timestamp
+        # A breach only counts as sustained while readings keep coming; restart the clock after a sensor gap
+        if last_timestamp is not None and timestamp - last_timestamp > RULE_MAX_GAP_SECONDS:
+            self.since = None
+        if not breached:
+            self.since = None
+            self.fired = False
+            return None
+        if self.since is None:
+            self.since = timestamp
+        if self.fired or timestamp - self.since < self.duration:
+            return None
+        self.fired = True
+        direction = "below" if self.below else "above"
+        minutes = (timestamp - self.since) // 60
+        return f"Glucose {value} mmol/L has been {direction} {self.threshold} for {minutes} min"
+
+
+class RateOfChangeRule:
+    """Fires when the EWMA of the slope between consecutive readings exceeds a threshold; re-arms below half of it."""
+
+    def __init__(self, name: str, threshold: float, alpha: float):
+        self.name = name
+        self.threshold = threshold
+        self.alpha = alpha
+        self.last: Optional[tuple] = None
+        self.slope: Optional[float] = None
+        self.fired = False
+
+    def update(self, value: float, timestamp: int) -> Optional[str]:
+        last, self.last = self.last, (value, timestamp)
+        if last is None or timestamp <= last[1]:
+            return None
+        # Don't derive a slope across a sensor gap
+        if timestamp - last[1] > RULE_MAX_GAP_SECONDS:
+            self.slope = None
+            return None
+        slope = (value - last[0]) / ((timestamp - last[1]) / 60)
+        self.slope = slope if self.slope is None else self.alpha * slope + (1 - self.alpha) * self.slope
+        if abs(self.slope) < self.threshold / 2:
+            self.fired = False
+        if self.fired or abs(self.slope) < self.threshold:
+            return None
+        self.fired = True
+        direction = "rising" if self.slope > 0 else "falling"
+        return f"Glucose {direction} fast at {self.slope:+.2f} mmol/L/min (now {value} mmol/L)"
+
+
+def default_rules() -> list:
+    return [
+        ThresholdRule("urgent_low", ALERT_URGENT_LOW_THRESHOLD, 0, below=True),
+        ThresholdRule("low", ALERT_LOW_THRESHOLD, ALERT_LOW_MINUTES, below=True),
+        ThresholdRule("high", ALERT_HIGH_THRESHOLD, ALERT_HIGH_MINUTES, below=False),
+        RateOfChangeRule("rate_of_change", ALERT_ROC_THRESHOLD, ALERT_ROC_ALPHA),
+    ]
+
+
+class AlertEngine:
+    """Evaluates rules incrementally, one reading at a time, with O(1) in-memory state per rule."""
+
+    def __init__(self, rules: list):
+        self.rules = rules
+        self.last_timestamp: Optional[int] = None
+
+    def evaluate(self, readings: List[dict], now: Optional[float] = None) -> List[dict]:
+        now = now or time.time()
+        alerts = []
+        for r in sorted(readings, key=lambda r: r["timestamp"]):
+            if r["timestamp"] > now + ALERT_MAX_SKEW_SECONDS:
+                logger.warning(f"Alert evaluation skipped future reading at {r['timestamp']}")
+                continue
+            # Re-sent or late readings were already seen (or are out of order); skip them
+            if self.last_timestamp is not None and r["timestamp"] <= self.last_timestamp:
+                continue
+            self.last_timestamp = r["timestamp"]
+            for rule in self.rules:
+                message = rule.update(r["value"], r["timestamp"])
+                if message and now - r["timestamp"] <= ALERT_MAX_AGE_SECONDS:
+                    alerts.append({"rule": rule.name, "value": r["value"], "timestamp": r["timestamp"], "message": message})
+        return alerts
+
+
+alert_engine = AlertEngine(default_rules())
+
+
+async def evaluate_alerts(
+    session: AsyncSession,
+    readings: List[dict]
+) -> List[dict]:
+    """Run newly ingested readings through the rules, then persist and publish any fired alerts"""
+    alerts = alert_engine.evaluate(readings)
+    if alerts:
+        await insert_alerts(session, alerts)
+        for alert in alerts:
+            ALERTS_FIRED.inc(alert["rule"])
+            logger.info(f"Alert: {alert['rule']}: {alert['message']}")
+            event_hub.publish({"type": "alert", **alert})
+    return alerts
+
+
+async def get_alerts(
+    session: AsyncSession,
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+    limit: int = 100
+):
+    return await fetch_alerts(session, from_ts, to_ts, limit)
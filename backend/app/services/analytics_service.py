@@ -0,0 +1,160 @@
+import asyncio
+import math
+import os
+from typing import List, Optional
+
+from app.core.local_time import day_range, day_span, day_start, week_of
+from app.repositories.analytics_repository import fetch_columns, fetch_local_columns
+from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import AsyncSession
+
+load_dotenv()
+
+# "sqlite" aggregates in-process over column fetches; "duckdb" runs the scan in an embedded columnar engine
+ANALYTICS_BACKEND = os.getenv("ANALYTICS_BACKEND", "sqlite")
+
+LOW_THRESHOLD = 3.9
+HIGH_THRESHOLD = 10.0
+MMOL_TO_MGDL = 18.016
+GRANULARITY_SECONDS = {"1m": 60, "1h": 3600}
+# Calendar granularities bucket on the indexed local_day column, so buckets start at local midnight
+CALENDAR_GRANULARITIES = ("1d", "1w")
+AGP_QUANTILES = {"p5": 0.05, "p25": 0.25, "p50": 0.5, "p75": 0.75, "p95": 0.95}
+
+
+def _quantile(sorted_values: List[float], q: float) -> float:
+    """Linear interpolation between closest ranks, matching DuckDB's quantile_cont"""
+    position = (len(sorted_values) - 1) * q
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _summary(raw: dict) -> dict:
+    count = raw["count"]
+    if not count:
+        return {"count": 0}
+    mean = raw["mean"]
+    below, above = raw["below"], raw["above"]
+    return {
+        "count": count,
+        "mean": mean,
+        "sd": raw["sd"],
+        "min": raw["min"],
+        "max": raw["max"],
+        "cv": raw["sd"] / mean * 100 if mean else None,
+        "gmi": 3.31 + 0.02392 * mean * MMOL_TO_MGDL,
+        "time_below_range": below / count * 100,
+        "time_in_range": (count - below - above) / count * 100,
+        "time_above_range": above / count * 100,
+    }
+
+
+def summarize(values: List[float]) -> dict:
+    if not values:
+        return {"count": 0, "mean": None, "sd": None, "min": None, "max": None, "below": 0, "above": 0}
+    count = len(values)
+    mean = sum(values) / count
+    return {
+        "count": count,
+        "mean": mean,
+        "sd": math.sqrt(sum((v - mean) ** 2 for v in values) / count),
+        "min": min(values),
+        "max": max(values),
+        "below": sum(1 for v in values if v < LOW_THRESHOLD),
+        "above": sum(1 for v in values if v > HIGH_THRESHOLD),
+    }
+
+
+def bucketize(timestamps: List[int], values: List[float], interval: int) -> List[dict]:
+    buckets = []
+    current = None
+    for ts, value in zip(timestamps, values):
+        start = ts - ts % interval
+        if current is None or current["timestamp"] != start:
+            current = {"timestamp": start, "count": 0, "mean": 0.0, "min": value, "max": value}
+            buckets.append(current)
+        current["count"] += 1
+        current["mean"] += value
+        current["min"] = min(current["min"], value)
+        current["max"] = max(current["max"], value)
+    for bucket in buckets:
+        bucket["mean"] /= bucket["count"]
+    return buckets
+
+
+def calendar_buckets(days: List[int], values: List[float], weekly: bool = False) -> List[dict]:
+    """Aggregate ascending rows by local day (or Monday-start week); buckets are stamped with their local midnight"""
+    keys = [week_of(d) for d in days] if weekly else days
+    buckets = bucketize(keys, values, 1)
+    for bucket in buckets:
+        bucket["timestamp"] = day_start(bucket["timestamp"])
+    return buckets
+
+
+def agp_profile(minutes: List[int], values: List[float], bin_minutes: int) -> List[dict]:
+    """Percentiles of values binned by local minute of day"""
+    bins = {}
+    for minute, value in zip(minutes, values):
+        bins.setdefault(minute // bin_minutes * bin_minutes, []).append(value)
+    profile = []
+    for minute in sorted(bins):
+        bin_values = sorted(bins[minute])
+        entry = {"minute": minute, "count": len(bin_values)}
+        entry.update((name, _quantile(bin_values, q)) for name, q in AGP_QUANTILES.items())
+        profile.append(entry)
+    return profile
+
+
+async def get_glucose_stats(
+    session: AsyncSession,
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+    granularity: str = "1d",
+) -> dict:
+    """Summary statistics for the range plus per-bucket aggregates"""
+    if granularity not in GRANULARITY_SECONDS and granularity not in CALENDAR_GRANULARITIES:
+        raise ValueError(f"Invalid granularity: {granularity}")
+    weekly = granularity == "1w"
+    if granularity in CALENDAR_GRANULARITIES:
+        # Calendar buckets cover whole local days (weeks), and so does the summary
+        from_day, to_day = day_range(from_ts, to_ts, weekly)
+        from_ts, to_ts = day_span(from_day, to_day)
+    if ANALYTICS_BACKEND == "duckdb":
+        from app.repositories import duckdb_repository
+
+        if granularity in CALENDAR_GRANULARITIES:
+            bucket_query = asyncio.to_thread(duckdb_repository.query_calendar_buckets, from_day, to_day, weekly)
+        else:
+            bucket_query = asyncio.to_thread(duckdb_repository.query_buckets, from_ts, to_ts, GRANULARITY_SECONDS[granularity])
+        raw, buckets = await asyncio.gather(
+            asyncio.to_thread(duckdb_repository.query_summary, from_ts, to_ts, LOW_THRESHOLD, HIGH_THRESHOLD),
+            bucket_query,
+        )
+    elif granularity in CALENDAR_GRANULARITIES:
+        days, values = await fetch_local_columns(session, "local_day", from_day, to_day)
+        raw = summarize(values)
+        buckets = calendar_buckets(days, values, weekly)
+    else:
+        timestamps, values = await fetch_columns(session, from_ts, to_ts)
+        raw = summarize(values)
+        buckets = bucketize(timestamps, values, GRANULARITY_SECONDS[granularity])
+    return {"summary": _summary(raw), "buckets": buckets}
+
+
+async def get_glucose_agp(
+    session: AsyncSession,
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+    bin_minutes: int = 15,
+) -> List[dict]:
+    """Ambulatory glucose profile: percentiles of readings by local time of day, over whole local days"""
+    if not 0 < bin_minutes <= 1440:
+        raise ValueError(f"Invalid bin size: {bin_minutes}")
+    from_day, to_day = day_range(from_ts, to_ts)
+    if ANALYTICS_BACKEND == "duckdb":
+        from app.repositories import duckdb_repository
+
+        return await asyncio.to_thread(duckdb_repository.query_agp, from_day, to_day, bin_minutes)
+    minutes, values = await fetch_local_columns(session, "local_minute", from_day, to_day)
+    return agp_profile(minutes, values, bin_minutes)
@@ -0,0 +1,75 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from app.db.database import engine
+from app.repositories import archive_repository
+from app.repositories.glucose_repository import (
+    delete_range,
+    fetch_oldest_timestamp,
+    fetch_rows_in_range,
+)
+from dotenv import load_dotenv
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+load_dotenv()
+
+# Number of most recent months (including the current one) kept in the live table
+ARCHIVE_RETENTION_MONTHS = int(os.getenv("ARCHIVE_RETENTION_MONTHS", "3"))
+
+
+def _month_start(year: int, month: int) -> datetime:
+    # Normalise month overflow/underflow, e.g. (2025, 13) -> 2026-01
+    year += (month - 1) // 12
+    month = (month - 1) % 12 + 1
+    return datetime(year, month, 1, tzinfo=timezone.utc)
+
+
+def closed_months(oldest_ts: int, retention_months: int, now: Optional[datetime] = None) -> List[tuple]:
+    """Return (label, start_ts, end_ts) for every month older than the retention window."""
+    now = now or datetime.now(timezone.utc)
+    cutoff = _month_start(now.year, now.month - (retention_months - 1))
+    oldest = datetime.fromtimestamp(oldest_ts, tz=timezone.utc)
+    months = []
+    start = _month_start(oldest.year, oldest.month)
+    while start < cutoff:
+        end = _month_start(start.year, start.month + 1)
+        months.append((start.strftime("%Y-%m"), int(start.timestamp()), int(end.timestamp())))
+        start = end
+    return months
+
+
+async def archive_closed_months(
+    session: AsyncSession,
+    retention_months: Optional[int] = None,
+) -> List[dict]:
+    """Move closed months out of the live table into Parquet segments"""
+    if retention_months is None:
+        retention_months = ARCHIVE_RETENTION_MONTHS
+    oldest_ts = await fetch_oldest_timestamp(session)
+    if oldest_ts is None:
+        return []
+    segments = {s["month"]: s for s in archive_repository.load_manifest()}
+    archived = []
+    for label, start_ts, end_ts in closed_months(oldest_ts, retention_months):
+        rows = await fetch_rows_in_range(session, start_ts, end_ts)
+        if not rows:
+            continue
+        # Segment and manifest are written before rows are removed; reads
+        # de-duplicate by timestamp, so a crash in between is harmless.
+        segment = await asyncio.to_thread(archive_repository.write_segment, label, rows)
+        segments[label] = segment
+        archive_repository.save_manifest(list(segments.values()))
+        removed = await delete_range(session, start_ts, end_ts)
+        logger.info(f"Archive: moved {removed} readings for {label} to {segment['path']}")
+        archived.append(segment)
+    return archived
+
+
+async def vacuum_database() -> None:
+    """Reclaim the space freed by archival (SQLite does not shrink the file on delete)"""
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.exec_driver_sql("VACUUM")
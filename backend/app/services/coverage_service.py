@@ -0,0 +1,46 @@
+import time
+from typing import List, Optional
+
+from app.repositories.coverage_repository import COVERAGE_MAX_GAP_SECONDS, fetch_runs
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Window used when the caller gives no `from`, matching the usual AGP reporting period
+DEFAULT_COVERAGE_SECONDS = 14 * 86400
+
+
+def find_gaps(runs: List[tuple], from_ts: int, to_ts: int, max_gap: int = COVERAGE_MAX_GAP_SECONDS) -> List[tuple]:
+    """Spans of [from_ts, to_ts] longer than max_gap that no run covers"""
+    gaps = []
+    cursor = from_ts
+    for start, end in runs:
+        if start - cursor > max_gap:
+            gaps.append((cursor, start))
+        cursor = max(cursor, end)
+    if to_ts - cursor > max_gap:
+        gaps.append((cursor, to_ts))
+    return gaps
+
+
+async def get_coverage(
+    session: AsyncSession,
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+) -> dict:
+    """Coverage runs and missing intervals in the range, read from the run index in O(runs)"""
+    to_ts = int(time.time()) if to_ts is None else to_ts
+    from_ts = to_ts - DEFAULT_COVERAGE_SECONDS if from_ts is None else from_ts
+    if from_ts >= to_ts:
+        raise ValueError("`from` must be before `to`")
+    runs = [(max(s, from_ts), min(e, to_ts)) for s, e in await fetch_runs(session, from_ts, to_ts)]
+    gaps = find_gaps(runs, from_ts, to_ts)
+    missing = sum(hi - lo for lo, hi in gaps)
+    return {
+        "from": from_ts,
+        "to": to_ts,
+        "max_gap_seconds": COVERAGE_MAX_GAP_SECONDS,
+        "covered_seconds": to_ts - from_ts - missing,
+        "missing_seconds": missing,
+        "coverage_percent": round(100 * (1 - missing / (to_ts - from_ts)), 2),
+        "runs": [{"from": lo, "to": hi, "seconds": hi - lo} for lo, hi in runs],
+        "gaps": [{"from": lo, "to": hi, "seconds": hi - lo} for lo, hi in gaps],
+    }
@@ -0,0 +1,167 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from app.core.executor import submit_chunks
+from app.core.rate_limit import expensive_slots
+from app.db.database import SessionLocal
+from app.services.export_renderer import (
+    EXPORT_FORMATS,
+    render_columns,
+    render_footer,
+    render_header,
+)
+from app.services.glucose_service import get_glucose_readings
+from dotenv import load_dotenv
+from loguru import logger
+
+load_dotenv()
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", "./exports")
+EXPORT_TTL_SECONDS = int(os.getenv("EXPORT_TTL_SECONDS", "3600"))
+MEDIA_TYPES = {"json": "application/json", "csv": "text/csv", "html": "text/html"}
+
+
+@dataclass
+class ExportJob:
+    id: str
+    params: dict
+    status: str = "pending"  # pending -> running -> completed | failed
+    progress: float = 0.0
+    created_at: float = 0.0
+    finished_at: Optional[float] = None
+    size: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def format(self) -> str:
+        return self.params["format"]
+
+    @property
+    def path(self) -> str:
+        return os.path.join(EXPORT_DIR, f"{self.id}.{self.format}")
+
+    @property
+    def expires_at(self) -> Optional[float]:
+        return self.finished_at + EXPORT_TTL_SECONDS if self.finished_at else None
+
+
+_jobs: Dict[str, ExportJob] = {}
+_tasks: Dict[str, asyncio.Task] = {}
+
+
+def job_id_for(params: dict) -> str:
+    """Jobs are keyed by a hash of their parameters so identical submissions share one artifact"""
+    canonical = json.dumps(params, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+def _purge_expired() -> None:
+    now = time.time()
+    for job in list(_jobs.values()):
+        if job.expires_at is not None and job.expires_at < now:
+            _jobs.pop(job.id, None)
+            if os.path.exists(job.path):
+                os.remove(job.path)
+            logger.debug(f"Export: expired job {job.id}")
+
+
+def _adopt_artifact(job_id: str, params: dict) -> Optional[ExportJob]:
+    """Pick up an unexpired artifact left on disk by a previous process"""
+    job = ExportJob(id=job_id, params=params)
+    if not os.path.exists(job.path):
+        return None
+    mtime = os.path.getmtime(job.path)
+    if mtime + EXPORT_TTL_SECONDS < time.time():
+        os.remove(job.path)
+        return None
+    job.status, job.progress = "completed", 1.0
+    job.created_at = job.finished_at = mtime
+    job.size = os.path.getsize(job.path)
+    return job
+
+
+async def _write_artifact(job: ExportJob, columns: tuple) -> int:
+    """Render chunks in the CPU pool and append them to a temp file in order, then atomically publish it"""
+    tmp_path = f"{job.path}.tmp"
+    params = job.params
+    count = len(columns[0])
+    futures = submit_chunks(render_columns, columns, job.format)
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(render_header(job.format, count, params["from_ts"], params["to_ts"]))
+            for i, future in enumerate(futures):
+                chunk = await future
+                await asyncio.to_thread(f.write, chunk)
+                job.progress = 0.5 + 0.5 * (i + 1) / len(futures)
+            f.write(render_footer(job.format))
+    except BaseException:
+        # Failed or cancelled: don't leave queued chunks rendering in the pool, or a partial file behind
+        for future in futures:
+            future.cancel()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, job.path)
+    return os.path.getsize(job.path)
+
+
+async def _run(job: ExportJob) -> None:
+    params = job.params
+    try:
+        # The submitting request only holds a slot while submitting; the job holds its own while it works
+        async with expensive_slots.held():
+            job.status = "running"
+            async with SessionLocal() as db:
+                readings = await get_glucose_readings(
+                    db, params["from_ts"], params["to_ts"], params["skip"], params["limit"], "asc", params["granularity"]
+                )
+                columns = ([r.id for r in readings], [r.value for r in readings], [r.timestamp for r in readings])
+            job.progress = 0.5
+            os.makedirs(EXPORT_DIR, exist_ok=True)
+            job.size = await _write_artifact(job, columns)
+        job.status, job.progress = "completed", 1.0
+        logger.info(f"Export: job {job.id} wrote {len(readings)} readings ({job.size} bytes)")
+    except asyncio.CancelledError:
+        job.status, job.error = "failed", "cancelled"
+        raise
+    except Exception as e:
+        logger.exception(f"Export: job {job.id} failed")
+        job.status, job.error = "failed", str(e)
+    finally:
+        job.finished_at = time.time()
+        _tasks.pop(job.id, None)
+
+
+def submit_export_job(
+    format: str = "json",
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    granularity: str = "all"
+) -> ExportJob:
+    """Start an export in the background, or return the existing job for identical parameters"""
+    if format not in EXPORT_FORMATS:
+        raise ValueError("Unsupported format")
+    _purge_expired()
+    params = dict(format=format, from_ts=from_ts, to_ts=to_ts, skip=skip, limit=limit, granularity=granularity)
+    job_id = job_id_for(params)
+    job = _jobs.get(job_id)
+    if job is not None and job.status != "failed":
+        return job
+    job = _adopt_artifact(job_id, params)
+    if job is None:
+        job = ExportJob(id=job_id, params=params, created_at=time.time())
+        _tasks[job_id] = asyncio.create_task(_run(job))
+    _jobs[job_id] = job
+    return job
+
+
+def get_export_job(job_id: str) -> Optional[ExportJob]:
+    _purge_expired()
+    return _jobs.get(job_id)
@@ -0,0 +1,168 @@
+from datetime import datetime
+from typing import List, Optional
+
+EXPORT_FORMATS = ("json", "csv", "html")
+CSV_HEADER = "ID,Glucose Value (mmol/L),Timestamp,Formatted Time\n"
+
+
+def _format_time(ts: int) -> str:
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _value_color(value: float) -> str:
+    # Color code the glucose value
+    if value < 3.9:
+        return "red"  # Low
+    if value > 10.0:
+        return "orange"  # High
+    if 3.9 <= value <= 7.8:
+        return "green"  # Normal
+    return "black"
+
+
+def render_header(
+    format: str,
+    count: int,
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None
+) -> str:
+    """Render everything that precedes the first row"""
+    if format == "json":
+        return "["
+    if format == "csv":
+        return CSV_HEADER
+    if format == "html":
+        return f"""
+        <!DOCTYPE html>
+        <html lang="en">
+        <head>
+            <meta charset="UTF-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>Glucose Readings Export</title>
+            <style>
+                body {{
+                    font-family: Arial, sans-serif;
+                    margin: 20px;
+                    background-color: #f5f5f5;
+                }}
+                .container {{
+                    max-width: 1200px;
+                    margin: 0 auto;
+                    background-color: white;
+                    padding: 20px;
+                    border-radius: 8px;
+                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+                }}
+                h1 {{
+                    color: #333;
+                    text-align: center;
+                    margin-bottom: 30px;
+                }}
+                table {{
+                    width: 100%;
+                    border-collapse: collapse;
+                    margin-top: 20px;
+                    background-color: white;
+                }}
+                th, td {{
+                    padding: 12px;
+                    text-align: left;
+                    border-bottom: 1px solid #ddd;
+                }}
+                th {{
+                    background-color: #4CAF50;
+                    color: white;
+                    font-weight: bold;
+                }}
+                tr:nth-child(even) {{
+                    background-color: #f2f2f2;
+                }}
+                tr:hover {{
+                    background-color: #e8f5e8;
+                }}
+                .summary {{
+                    margin-top: 20px;
+                    padding: 15px;
+                    background-color: #e8f5e8;
+                    border-radius: 5px;
+                }}
+                .timestamp {{
+                    color: #666;
+                    font-size: 0.9em;
+                    text-align: center;
+                    margin-top: 20px;
+                }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <h1>📊 Glucose Readings Report</h1>
+                
+                <div class="summary">
+                    <strong>Summary:</strong> {count} readings exported
+                    {f" (from {datetime.fromtimestamp(from_ts).strftime('%Y-%m-%d %H:%M:%S') if from_ts else 'beginning'} to {datetime.fromtimestamp(to_ts).strftime('%Y-%m-%d %H:%M:%S') if to_ts else 'now'})" if from_ts or to_ts else ""}
+                </div>
+                
+                <table>
+                    <thead>
+                        <tr>
+                            <th>ID</th>
+                            <th>Glucose Value</th>
+                            <th>Timestamp</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+                        """
+    raise ValueError("Unsupported format")
+
+
+def render_rows(format: str, rows: List[tuple], first: bool = True) -> str:
+    """Render a chunk of (id, value, timestamp) rows; `first` marks the chunk right after the header"""
+    if not rows:
+        return ""
+    if format == "json":
+        body = ",".join(f'{{"id":{i},"value":{v},"timestamp":{t}}}' for i, v, t in rows)
+        return body if first else "," + body
+    if format == "csv":
+        body = "\n".join(f"{i},{v},{t},{_format_time(t)}" for i, v, t in rows)
+        return body if first else "\n" + body
+    if format == "html":
+        parts = []
+        for r_id, r_value, r_timestamp in rows:
+            formatted_time = _format_time(r_timestamp)
+            value_color = _value_color(r_value)
+            parts.append(f"""
+            <tr>
+                <td>{r_id}</td>
+                <td style="color: {value_color}; font-weight: bold;">{r_value} mmol/L</td>
+                <td>{formatted_time}</td>
+            </tr>
+            """)
+        return "".join(parts)
+    raise ValueError("Unsupported format")
+
+
+def render_columns(ids: List[int], values: List[float], timestamps: List[int], first: bool, format: str) -> str:
+    """Columnar entry point for worker pools: columns pickle far cheaper than row tuples"""
+    return render_rows(format, list(zip(ids, values, timestamps)), first)
+
+
+def render_footer(format: str) -> str:
+    if format == "json":
+        return "]"
+    if format == "csv":
+        return ""
+    if format == "html":
+        return f"""
+                    </tbody>
+                </table>
+                
+                <div class="timestamp">
+                    Report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+    raise ValueError("Unsupported format")
+
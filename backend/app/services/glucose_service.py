@@ -1,88 +1,148 @@
-import json
+import asyncio
+import bisect
 from typing import List, Optional
 
 import fetch_glucose
-from app.db.sse_queue import sse_queue
+from app.core.executor import submit_chunks
+from app.core.local_time import local_grid, local_keys
+from app.db.range_cache import range_cache
+from app.db.write_lock import lock_reading_writes
 from app.models.glucose_reading import GlucoseReading as GlucoseReadingModel
 from app.repositories.glucose_repository import (
     delete_readings,
+    fetch_changes,
     fetch_latest,
     fetch_readings,
-    upsert_readings,
+    fetch_rows_in_windows,
 )
-from app.schemas.glucose_reading import GlucoseReadingCreate, RemoteReading
+from app.schemas.glucose_reading import (
+    GlucoseReadingCreate,
+    ReadingRow,
+    RemoteReading,
+)
+from app.services.export_renderer import (
+    EXPORT_FORMATS,
+    render_columns,
+    render_footer,
+    render_header,
+)
+from app.services.ingest_service import ingest_readings
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
-async def get_glucose_readings(
-    session: AsyncSession,
-    from_ts: Optional[int] = None,
-    to_ts: Optional[int] = None,
-    skip: int = 0,
-    limit: Optional[int] = None,
-    order: Optional[str] = "asc",
-    granularity: str = "all"
-) -> List[GlucoseReadingModel]:
-    readings = await fetch_readings(session, from_ts, to_ts, skip, limit, order)
-    if not readings:
-        return []
-    match (granularity):
-        case "all":
-            return readings
-        case "1m":
-            interval = 60
-        case "1h":
-            # TODO: Should calculate average of readings for hour and day granularity
-            interval = 3600
-        case "1d":
-            interval = 86400
-        case _:
-            raise ValueError(f"Invalid granularity: {granularity}")
-    
-    if order == "desc":
-        readings.reverse()
+GRANULARITY_INTERVALS = {"1m": 60, "1h": 3600, "1d": 86400}
+
+
+def downsample(rows: List[ReadingRow], interval: int) -> List[ReadingRow]:
+    """Snap ascending rows to the local `interval` grid (local midnights for 1d), keeping the reading closest to each grid point"""
     delta = interval / 2
-    if readings[0].timestamp % interval > delta:
-        current_interval = readings[0].timestamp - readings[0].timestamp % interval + interval
-    else:
-        current_interval = readings[0].timestamp - readings[0].timestamp % interval
+    first_ts = rows[0].timestamp
+    grid = local_grid(first_ts, interval)
+    current_interval = next(grid)
+    if first_ts - current_interval > delta:
+        current_interval = next(grid)
     gran_readings = []
     current_delta = delta
     current_closest = None
     i = 0
-    while i < len(readings):
-        reading = readings[i]
-        if reading.timestamp - current_interval < -delta:
+    while i < len(rows):
+        row = rows[i]
+        if row.timestamp - current_interval < -delta:
             i += 1
             continue
-        if abs(reading.timestamp - current_interval) < current_delta:
-            current_delta = abs(reading.timestamp - current_interval)
-            current_closest = reading
-            current_closest.timestamp = current_interval
+        distance = abs(row.timestamp - current_interval)
+        # A reading exactly half an interval out still counts, as in StreamDownsampler
+        if distance < current_delta or (current_closest is None and distance <= delta):
+            current_delta = distance
+            current_closest = row
             i += 1
         else:
             if current_closest is not None:
-                gran_readings.append(GlucoseReadingModel(
-                    id=current_closest.id,
-                    value=current_closest.value,
-                    timestamp=current_closest.timestamp
-                ))
+                gran_readings.append(ReadingRow(current_closest.id, current_closest.value, current_interval))
             current_closest = None
-            current_interval += interval
+            current_interval = next(grid)
             current_delta = delta
-    if order == "desc":
-        gran_readings.reverse()
     return gran_readings
 
+async def get_glucose_readings(
+    session: AsyncSession,
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    order: Optional[str] = "asc",
+    granularity: str = "all"
+) -> List[ReadingRow]:
+    if granularity != "all" and granularity not in GRANULARITY_INTERVALS:
+        raise ValueError(f"Invalid granularity: {granularity}")
+    key = (from_ts, to_ts, skip, limit, order, granularity)
+    generation = range_cache.generation
+    rows = range_cache.get(key)
+    if rows is None:
+        rows = await compute_glucose_readings(session, from_ts, to_ts, skip, limit, order, granularity)
+        range_cache.put(key, from_ts, to_ts, rows, generation)
+    return list(rows)
+
+async def compute_glucose_readings(
+    session: AsyncSession,
+    from_ts: Optional[int] = None,
+    to_ts: Optional[int] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    order: Optional[str] = "asc",
+    granularity: str = "all"
+) -> List[ReadingRow]:
+    """get_glucose_readings without the range cache, for one-off ranges such as stream backfills"""
+    readings = await fetch_readings(session, from_ts, to_ts, skip, limit, order)
+    rows = [ReadingRow(r.id, r.value, r.timestamp) for r in readings]
+    if rows and granularity != "all":
+        # TODO: Should calculate average of readings for hour and day granularity
+        if order == "desc":
+            rows.reverse()
+        rows = downsample(rows, GRANULARITY_INTERVALS[granularity])
+        if order == "desc":
+            rows.reverse()
+    return rows
+
+async def get_glucose_windows(
+    session: AsyncSession,
+    windows: List[tuple]
+) -> List[List[ReadingRow]]:
+    """Series for many (from_ts, to_ts, granularity) windows, fetched with one database round trip"""
+    for _, _, granularity in windows:
+        if granularity != "all" and granularity not in GRANULARITY_INTERVALS:
+            raise ValueError(f"Invalid granularity: {granularity}")
+    # Same keys as get_glucose_readings, so single-window and batch requests share cache entries
+    keys = [(from_ts, to_ts, 0, None, "asc", granularity) for from_ts, to_ts, granularity in windows]
+    generation = range_cache.generation
+    results = [range_cache.get(key) for key in keys]
+    missing = [i for i, rows in enumerate(results) if rows is None]
+    if missing:
+        fetched = await fetch_rows_in_windows(session, [windows[i][:2] for i in missing])
+        fetched_ts = [r[2] for r in fetched]
+        for i in missing:
+            from_ts, to_ts, granularity = windows[i]
+            lo = bisect.bisect_left(fetched_ts, from_ts)
+            hi = bisect.bisect_right(fetched_ts, to_ts)
+            rows = [ReadingRow(*r) for r in fetched[lo:hi]]
+            if rows and granularity != "all":
+                rows = downsample(rows, GRANULARITY_INTERVALS[granularity])
+            range_cache.put(keys[i], from_ts, to_ts, rows, generation)
+            results[i] = rows
+    return [list(rows) for rows in results]
+
 async def create_glucose_reading(
     session: AsyncSession,
     reading: GlucoseReadingCreate
 ) -> GlucoseReadingModel:
-    model = GlucoseReadingModel(value=reading.value, timestamp=reading.timestamp)
+    local_day, local_minute = local_keys(reading.timestamp)
+    model = GlucoseReadingModel(value=reading.value, timestamp=reading.timestamp, local_day=local_day, local_minute=local_minute)
+    await lock_reading_writes(session)
     session.add(model)
     await session.commit()
     await session.refresh(model)
+    range_cache.invalidate([model.timestamp])
     return model
 
 async def create_bulk_readings(
@@ -90,8 +150,7 @@ async def create_bulk_readings(
     readings: List[GlucoseReadingCreate],
     format: str = "json"
 ) -> List[GlucoseReadingModel]:
-    data = [dict(value=r.value, timestamp=r.timestamp) for r in readings]
-    await upsert_readings(session, data)
+    await ingest_readings(session, [dict(value=r.value, timestamp=r.timestamp) for r in readings])
     # fetch and return updated entities
     return await fetch_readings(session)
 
@@ -101,11 +160,9 @@ async def fetch_and_save_remote(
     logger.debug("Service: fetching remote readings")
     token = await fetch_glucose.get_token()
     readings = await fetch_glucose.fetch_glucose_readings(token)
-    data = [dict(value=r["value"], timestamp=r["timestamp"]) for r in readings]
-    if data:
-        await upsert_readings(session, data)
-    logger.info(f"Service: fetched and saved {len(readings)} remote readings")
-    return readings
+    await ingest_readings(session, [dict(value=r["value"], timestamp=r["timestamp"]) for r in readings["readings"]])
+    logger.info(f"Service: fetched and saved {len(readings['readings'])} remote readings")
+    return readings["readings"]
 
 async def delete_glucose_readings(
     session: AsyncSession,
@@ -121,162 +178,32 @@ async def export_glucose_readings(
     from_ts: Optional[int] = None,
     to_ts: Optional[int] = None,
     skip: int = 0,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    granularity: str = "all"
 ):
-    readings = await fetch_readings(session, from_ts, to_ts, skip, limit)
+    if format not in EXPORT_FORMATS:
+        raise ValueError("Unsupported format")
+    readings = await get_glucose_readings(session, from_ts, to_ts, skip, limit, "asc", granularity)
     if format == "json":
-        return [r.__dict__ for r in readings]
-    # CSV/HTML export logic to be implemented elsewhere
-    if format == "csv":
-        from datetime import datetime
-        
-        header = "ID,Glucose Value (mmol/L),Timestamp,Formatted Time\n"
-        rows = []
-        for r in readings:
-            dt = datetime.fromtimestamp(r.timestamp)
-            formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S")
-            rows.append(f"{r.id},{r.value},{r.timestamp},{formatted_time}")
-        return header + "\n".join(rows)
-    if format == "html":
-        from datetime import datetime
+        return [dict(id=r.id, value=r.value, timestamp=r.timestamp) for r in readings]
+    columns = ([r.id for r in readings], [r.value for r in readings], [r.timestamp for r in readings])
+    # Rendering is CPU-bound; chunks are rendered in the worker pool so the event loop stays responsive
+    chunks = await asyncio.gather(*submit_chunks(render_columns, columns, format))
+    return render_header(format, len(readings), from_ts, to_ts) + "".join(chunks) + render_footer(format)
 
-        # Create table rows with formatted timestamp
-        table_rows = ""
-        for r in readings:
-            # Convert epoch timestamp to readable format
-            dt = datetime.fromtimestamp(r.timestamp)
-            formatted_time = dt.strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Color code the glucose value
-            value_color = "black"
-            if r.value < 3.9:
-                value_color = "red"  # Low
-            elif r.value > 10.0:
-                value_color = "orange"  # High
-            elif 3.9 <= r.value <= 7.8:
-                value_color = "green"  # Normal
-            
-            table_rows += f"""
-            <tr>
-                <td>{r.id}</td>
-                <td style="color: {value_color}; font-weight: bold;">{r.value} mmol/L</td>
-                <td>{formatted_time}</td>
-            </tr>
-            """
-        
-        html_export = f"""
-        <!DOCTYPE html>
-        <html lang="en">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Glucose Readings Export</title>
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    margin: 20px;
-                    background-color: #f5f5f5;
-                }}
-                .container {{
-                    max-width: 1200px;
-                    margin: 0 auto;
-                    background-color: white;
-                    padding: 20px;
-                    border-radius: 8px;
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                }}
-                h1 {{
-                    color: #333;
-                    text-align: center;
-                    margin-bottom: 30px;
-                }}
-                table {{
-                    width: 100%;
-                    border-collapse: collapse;
-                    margin-top: 20px;
-                    background-color: white;
-                }}
-                th, td {{
-                    padding: 12px;
-                    text-align: left;
-                    border-bottom: 1px solid #ddd;
-                }}
-                th {{
-                    background-color: #4CAF50;
-                    color: white;
-                    font-weight: bold;
-                }}
-                tr:nth-child(even) {{
-                    background-color: #f2f2f2;
-                }}
-                tr:hover {{
-                    background-color: #e8f5e8;
-                }}
-                .summary {{
-                    margin-top: 20px;
-                    padding: 15px;
-                    background-color: #e8f5e8;
-                    border-radius: 5px;
-                }}
-                .timestamp {{
-                    color: #666;
-                    font-size: 0.9em;
-                    text-align: center;
-                    margin-top: 20px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>📊 Glucose Readings Report</h1>
-                
-                <div class="summary">
-                    <strong>Summary:</strong> {len(readings)} readings exported
-                    {f" (from {datetime.fromtimestamp(from_ts).strftime('%Y-%m-%d %H:%M:%S') if from_ts else 'beginning'} to {datetime.fromtimestamp(to_ts).strftime('%Y-%m-%d %H:%M:%S') if to_ts else 'now'})" if from_ts or to_ts else ""}
-                </div>
-                
-                <table>
-                    <thead>
-                        <tr>
-                            <th>ID</th>
-                            <th>Glucose Value</th>
-                            <th>Timestamp</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                        {table_rows}
-                    </tbody>
-                </table>
-                
-                <div class="timestamp">
-                    Report generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        return html_export
-    raise ValueError("Unsupported format")
+async def get_reading_changes(
+    session: AsyncSession,
+    since: int = 0,
+    limit: int = 1000
+) -> dict:
+    changes = await fetch_changes(session, since, limit)
+    return {
+        "changes": changes,
+        "last_seq": changes[-1].seq if changes else since,
+        "has_more": len(changes) == limit,
+    }
 
 async def get_latest_glucose_reading(
     session: AsyncSession
 ) -> Optional[GlucoseReadingModel]:
     return await fetch_latest(session)
-
-async def stream_glucose_readings() -> List[dict]:
-    reading = await sse_queue.get()
-    if reading is None:
-        raise ValueError("No reading found in SSE queue")
-    assert isinstance(reading, str)
-    reading = json.loads(reading)
-    assert isinstance(reading, list)
-    assert len(reading) == 1
-    reading = reading[0]
-    logger.debug(f"Service: received reading: {reading}")
-    minute_timestamp = reading["timestamp"] - reading["timestamp"] % 60 + 60
-    return [
-        {
-            "value": reading["value"],
-            "timestamp": minute_timestamp,
-        }
-    ]
\ No newline at end of file
@@ -0,0 +1,110 @@
+import os
+from typing import List
+
+from app.core.metrics import INGESTED_READINGS
+from app.db.event_hub import event_hub
+from app.repositories.glucose_repository import (
+    fetch_latest,
+    fetch_oldest_timestamp,
+    fetch_rows_in_range,
+    replace_range,
+    upsert_readings,
+)
+from app.services.alert_service import evaluate_alerts
+from dotenv import load_dotenv
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+load_dotenv()
+
+# Width of a canonical sensor slot; readings are stored on this grid
+INGEST_SLOT_SECONDS = int(os.getenv("INGEST_SLOT_SECONDS", "60"))
+# How a raw timestamp maps to a slot: "nearest", "floor", or "none" (keep raw timestamps)
+INGEST_SLOT_POLICY = os.getenv("INGEST_SLOT_POLICY", "nearest")
+# How readings that land in the same slot are merged: "last", "first" or "mean". "first" also keeps
+# an already stored slot value; "mean" averages within one batch only, since a stored mean can't be re-weighted
+INGEST_MERGE_POLICY = os.getenv("INGEST_MERGE_POLICY", "last")
+# Span of raw timestamps processed per compaction transaction
+COMPACTION_CHUNK_SECONDS = 7 * 86400
+
+
+def canonical_slot(ts: int) -> int:
+    if INGEST_SLOT_POLICY == "none":
+        return ts
+    if INGEST_SLOT_POLICY == "floor":
+        return ts - ts % INGEST_SLOT_SECONDS
+    return (ts + INGEST_SLOT_SECONDS // 2) // INGEST_SLOT_SECONDS * INGEST_SLOT_SECONDS
+
+
+def slot_source_range(start: int, end: int) -> tuple:
+    """Raw timestamp range [lo, hi) whose readings map to slots in [start, end)"""
+    if INGEST_SLOT_POLICY == "nearest":
+        half = INGEST_SLOT_SECONDS // 2
+        return start - half, end - half
+    return start, end
+
+
+def normalize_readings(readings: List[dict]) -> List[dict]:
+    """Assign readings to canonical slots and merge readings sharing a slot, per the configured policies"""
+    slots = {}
+    for r in sorted(readings, key=lambda r: r["timestamp"]):
+        slots.setdefault(canonical_slot(r["timestamp"]), []).append(r["value"])
+    normalized = []
+    for slot in sorted(slots):
+        values = slots[slot]
+        if INGEST_MERGE_POLICY == "first":
+            value = values[0]
+        elif INGEST_MERGE_POLICY == "mean":
+            value = round(sum(values) / len(values), 1)
+        else:
+            value = values[-1]
+        normalized.append({"value": value, "timestamp": slot})
+    return normalized
+
+
+async def ingest_readings(
+    session: AsyncSession,
+    readings: List[dict]
+) -> List[dict]:
+    """Normalize and upsert readings, publish new or changed ones to stream subscribers and run the alert rules"""
+    normalized = normalize_readings(readings)
+    if normalized and INGEST_MERGE_POLICY == "first":
+        # The earliest reading for a slot may have arrived in an earlier poll
+        stored = {t: v for _, v, t in await fetch_rows_in_range(session, normalized[0]["timestamp"], normalized[-1]["timestamp"] + 1)}
+        normalized = [{"value": stored.get(r["timestamp"], r["value"]), "timestamp": r["timestamp"]} for r in normalized]
+    if normalized:
+        changes = await upsert_readings(session, normalized)
+        INGESTED_READINGS.inc(amount=len(normalized))
+        if changes:
+            changed = sorted(({"value": c["value"], "timestamp": c["timestamp"]} for c in changes), key=lambda r: r["timestamp"])
+            event_hub.publish({"type": "readings", "readings": changed})
+        await evaluate_alerts(session, normalized)
+    return normalized
+
+
+async def compact_readings(
+    session: AsyncSession
+) -> dict:
+    """One-off rewrite of existing live rows onto canonical slots, merging near-duplicates"""
+    oldest_ts = await fetch_oldest_timestamp(session)
+    latest = await fetch_latest(session)
+    stats = {"rows_before": 0, "rows_after": 0, "chunks_rewritten": 0}
+    if oldest_ts is None or INGEST_SLOT_POLICY == "none":
+        return stats
+    # Chunks are whole numbers of slots starting on the grid, so every slot is owned by exactly one chunk
+    chunk = max(1, COMPACTION_CHUNK_SECONDS // INGEST_SLOT_SECONDS) * INGEST_SLOT_SECONDS
+    start = canonical_slot(oldest_ts)
+    while True:
+        lo, hi = slot_source_range(start, start + chunk)
+        if lo > latest.timestamp:
+            break
+        rows = await fetch_rows_in_range(session, lo, hi)
+        normalized = normalize_readings([{"value": v, "timestamp": t} for _, v, t in rows])
+        stats["rows_before"] += len(rows)
+        stats["rows_after"] += len(normalized)
+        if [(r["timestamp"], r["value"]) for r in normalized] != [(t, v) for _, v, t in rows]:
+            await replace_range(session, lo, hi, normalized)
+            stats["chunks_rewritten"] += 1
+        start += chunk
+    logger.info(f"Compaction: {stats['rows_before']} -> {stats['rows_after']} rows ({stats['chunks_rewritten']} chunks rewritten)")
+    return stats
@@ -0,0 +1,93 @@
+import asyncio
+import os
+import time
+from typing import Optional, Tuple
+
+import fetch_glucose
+from dotenv import load_dotenv
+from loguru import logger
+
+load_dotenv()
+
+# Snapshots younger than this are served without contacting LibreView; the poller refreshes every minute
+LIBRE_CACHE_TTL_SECONDS = int(os.getenv("LIBRE_CACHE_TTL_SECONDS", "90"))
+# Consecutive upstream failures that open the circuit, and how long it stays open
+LIBRE_BREAKER_THRESHOLD = int(os.getenv("LIBRE_BREAKER_THRESHOLD", "3"))
+LIBRE_BREAKER_RESET_SECONDS = int(os.getenv("LIBRE_BREAKER_RESET_SECONDS", "60"))
+
+
+class UpstreamUnavailable(Exception):
+    pass
+
+
+_snapshot = {"readings": None, "fetched_at": None}
+_breaker = {"failures": 0, "opened_at": None}
+_inflight: Optional[asyncio.Future] = None
+
+
+def _circuit_open() -> bool:
+    opened_at = _breaker["opened_at"]
+    return opened_at is not None and time.time() - opened_at < LIBRE_BREAKER_RESET_SECONDS
+
+
+async def _fetch() -> dict:
+    try:
+        token = await fetch_glucose.get_token()
+        readings = await fetch_glucose.fetch_glucose_readings(token)
+    except Exception:
+        _breaker["failures"] += 1
+        if _breaker["failures"] >= LIBRE_BREAKER_THRESHOLD:
+            if not _circuit_open():
+                logger.warning(f"LibreView: circuit opened after {_breaker['failures']} consecutive failures")
+            _breaker["opened_at"] = time.time()
+        raise
+    _breaker["failures"] = 0
+    _breaker["opened_at"] = None
+    _snapshot["readings"] = readings
+    _snapshot["fetched_at"] = time.time()
+    return readings
+
+
+def _clear_inflight(future: asyncio.Future) -> None:
+    global _inflight
+    if _inflight is future:
+        _inflight = None
+
+
+async def refresh_snapshot(bypass_breaker: bool = False) -> dict:
+    """Fetch from LibreView, coalescing concurrent callers into a single upstream request.
+
+    The poller bypasses the breaker so it doubles as the half-open probe.
+    """
+    global _inflight
+    if not bypass_breaker and _circuit_open():
+        raise UpstreamUnavailable("LibreView circuit is open")
+    if _inflight is None:
+        _inflight = asyncio.ensure_future(_fetch())
+        _inflight.add_done_callback(_clear_inflight)
+    # Shield so one cancelled caller does not cancel the fetch for everyone else
+    return await asyncio.shield(_inflight)
+
+
+def snapshot_metadata() -> dict:
+    fetched_at = _snapshot["fetched_at"]
+    age = time.time() - fetched_at if fetched_at is not None else None
+    return {
+        "fetched_at": fetched_at,
+        "age": age,
+        "stale": age is None or age > LIBRE_CACHE_TTL_SECONDS,
+        "circuit": "open" if _circuit_open() else "closed",
+    }
+
+
+async def get_snapshot() -> Tuple[dict, dict]:
+    """Return (readings, metadata), serving the poller's snapshot while fresh and stale data during outages"""
+    if not snapshot_metadata()["stale"]:
+        return _snapshot["readings"], snapshot_metadata()
+    try:
+        await refresh_snapshot()
+    except Exception as e:
+        if _snapshot["readings"] is None:
+            raise UpstreamUnavailable(str(e)) from e
+        logger.warning(f"LibreView: serving stale snapshot ({e})")
+    return _snapshot["readings"], snapshot_metadata()
@@ -0,0 +1,72 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from app.db.write_lock import lock_reading_writes
+from app.repositories import archive_repository
+from app.repositories.alert_repository import move_alerts
+from app.repositories.coverage_repository import rebuild_coverage
+from app.repositories.glucose_repository import (
+    fetch_latest,
+    fetch_oldest_timestamp,
+    fetch_rows_in_range,
+    move_readings,
+)
+from app.repositories.maintenance_repository import fetch_step, record_step
+from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# maintenance_steps marker; the re-stamp is not idempotent, so it runs at most once per database
+RESTAMP_STEP = "restamp_libre_timestamps"
+
+
+def restamp(ts: int, zone: ZoneInfo) -> int:
+    """Undo the old LibreView parsing, which read the local wall clock as if it were UTC (per row, so DST-aware)"""
+    wall_clock = datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=zone)
+    return int(wall_clock.timestamp())
+
+
+async def restamp_readings(
+    session: AsyncSession,
+    timezone_name: str,
+    since: int,
+    until: int
+) -> dict:
+    """One-off shift of readings stored in [since, until) from wall-clock-as-UTC to true UTC, with their alerts and archive"""
+    zone = ZoneInfo(timezone_name)
+    await lock_reading_writes(session)
+    step = await fetch_step(session, RESTAMP_STEP)
+    if step is not None:
+        raise RuntimeError(f"Readings were already re-stamped at {step.applied_at} ({step.detail}); refusing to shift them again")
+    moves = {}
+    for _, _, ts in await fetch_rows_in_range(session, since, until):
+        new_ts = restamp(ts, zone)
+        if new_ts != ts:
+            moves[ts] = new_ts
+    alerts = await move_alerts(session, moves)
+    await record_step(session, RESTAMP_STEP, json.dumps({"timezone": timezone_name, "since": since, "until": until}))
+    changes = await move_readings(session, moves)
+    # Commits the marker even when there was nothing to move
+    await session.commit()
+    archived = await asyncio.to_thread(archive_repository.restamp_segments, since, until, lambda ts: restamp(ts, zone))
+    # Runs also span archived readings (archival leaves them alone), so rebuild them from both
+    await lock_reading_writes(session)
+    timestamps = list(await asyncio.to_thread(
+        archive_repository.read_segment_columns, archive_repository.load_manifest()
+    ))
+    oldest_ts = await fetch_oldest_timestamp(session)
+    if oldest_ts is not None:
+        latest = await fetch_latest(session)
+        timestamps += [t for _, _, t in await fetch_rows_in_range(session, oldest_ts, latest.timestamp + 1)]
+    runs = await rebuild_coverage(session, timestamps)
+    await session.commit()
+    stats = {
+        "readings_moved": sum(1 for c in changes if c["op"] == "insert"),
+        "readings_dropped": len(moves) - sum(1 for c in changes if c["op"] == "insert"),
+        "alerts_moved": alerts,
+        "archived_moved": archived,
+        "coverage_runs": runs,
+    }
+    logger.info(f"Re-stamp from {timezone_name}: {stats}")
+    return stats
@@ -0,0 +1,105 @@
+import struct
+import time
+from typing import AsyncIterator, List, Optional, Tuple
+
+from app.core.local_time import grid_floor
+from app.db.database import SessionLocal
+from app.db.event_hub import event_hub
+from app.schemas.glucose_reading import ReadingRow
+from app.services.glucose_service import GRANULARITY_INTERVALS, compute_glucose_readings
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Backfill requested over a WebSocket is capped to this many seconds
+MAX_BACKFILL_SECONDS = 30 * 86400
+# Binary frames: header (version, kind, count) followed by (uint32 timestamp, float32 value) records
+BINARY_VERSION = 1
+BINARY_KINDS = {"backfill": 1, "reading": 2}
+_HEADER = struct.Struct("<BBI")
+_RECORD = struct.Struct("<If")
+
+
+class StreamDownsampler:
+    """Incremental counterpart of `downsample` for one subscription.
+
+    When a reading crosses a grid point, whichever of it and the previous reading is
+    closer (within half an interval) is emitted, stamped with the grid point. This
+    costs no delay: with readings already on the grid, each is emitted as it arrives.
+    """
+
+    def __init__(self, granularity: str, last_emitted: Optional[int] = None):
+        self.interval = GRANULARITY_INTERVALS.get(granularity)
+        self.last_emitted = last_emitted
+        self.previous: Optional[dict] = None
+
+    def push(self, reading: dict) -> Optional[dict]:
+        if self.interval is None:
+            return reading
+        ts = reading["timestamp"]
+        previous, self.previous = self.previous, reading
+        grid = grid_floor(ts, self.interval)
+        if self.last_emitted is not None and grid <= self.last_emitted:
+            return None
+        if previous is not None and previous["timestamp"] >= grid:
+            return None
+        half = self.interval / 2
+        candidates = [r for r in (previous, reading) if r is not None and abs(r["timestamp"] - grid) <= half]
+        if not candidates:
+            return None
+        closest = min(candidates, key=lambda r: abs(r["timestamp"] - grid))
+        self.last_emitted = grid
+        return {"value": closest["value"], "timestamp": grid}
+
+
+async def get_backfill(
+    session: AsyncSession,
+    granularity: str,
+    from_ts: int,
+    limit: Optional[int] = None
+) -> List[ReadingRow]:
+    """Readings since `from_ts` at `granularity`, keeping the last `limit`"""
+    # Uncached: `from_ts` moves with every connect, so an entry would never be hit again
+    rows = await compute_glucose_readings(session, from_ts, None, 0, None, "asc", granularity)
+    return rows[-limit:] if limit else rows
+
+
+async def subscribe_readings(
+    granularity: str,
+    backfill_seconds: int,
+    backfill_limit: Optional[int] = None,
+) -> AsyncIterator[Tuple[str, object]]:
+    """Yield ("backfill", [rows]) once, then ("reading", {value, timestamp}) and ("alert", {...}) as they happen.
+
+    The hub subscription is opened before the backfill query, so nothing published
+    in between is lost; live readings already covered by the backfill are skipped.
+    """
+    if granularity != "all" and granularity not in GRANULARITY_INTERVALS:
+        raise ValueError(f"Invalid granularity: {granularity}")
+    backfill_seconds = min(backfill_seconds, MAX_BACKFILL_SECONDS)
+    with event_hub.subscribe() as queue:
+        # Short-lived session: an idle subscriber shouldn't hold a pooled connection
+        async with SessionLocal() as session:
+            rows = await get_backfill(session, granularity, int(time.time()) - backfill_seconds, backfill_limit)
+        last_ts = rows[-1].timestamp if rows else None
+        yield "backfill", rows
+        downsampler = StreamDownsampler(granularity, last_ts)
+        while True:
+            event = await queue.get()
+            if event["type"] == "alert":
+                yield "alert", {k: v for k, v in event.items() if k != "type"}
+                continue
+            for reading in event["readings"]:
+                if last_ts is not None and reading["timestamp"] <= last_ts:
+                    continue
+                emitted = downsampler.push(reading)
+                if emitted is not None:
+                    yield "reading", emitted
+
+
+def encode_binary(kind: str, readings: List) -> bytes:
+    """Pack rows or reading dicts into one binary frame (8 bytes per reading)"""
+    header = _HEADER.pack(BINARY_VERSION, BINARY_KINDS[kind], len(readings))
+    records = b"".join(
+        _RECORD.pack(r["timestamp"], r["value"]) if isinstance(r, dict) else _RECORD.pack(r.timestamp, r.value)
+        for r in readings
+    )
+    return header + records
@@ -0,0 +1,23 @@
+import argparse
+import asyncio
+
+from app.db.database import SessionLocal
+from app.services.archive_service import archive_closed_months, vacuum_database
+from loguru import logger
+
+
+async def main(retention_months: int = None, vacuum: bool = False):
+    async with SessionLocal() as db:
+        segments = await archive_closed_months(db, retention_months)
+    logger.info(f"Archived {len(segments)} month(s): {[s['month'] for s in segments]}")
+    if vacuum and segments:
+        await vacuum_database()
+        logger.info("Vacuumed live database")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Archive closed months of glucose readings to Parquet segments")
+    parser.add_argument("--retention-months", type=int, default=None, help="Months (including the current one) to keep in the live table")
+    parser.add_argument("--vacuum", action="store_true", help="VACUUM the SQLite file after archiving")
+    args = parser.parse_args()
+    asyncio.run(main(args.retention_months, args.vacuum))
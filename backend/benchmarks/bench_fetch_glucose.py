@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+
+import pytest
+
+import fetch_glucose
+from benchmarks.generate_dataset import generate_series
+
+BENCH_START = 1767225600
+
+
+def libre_view_payload(points: int) -> dict:
+    """A graph response shaped like LibreView's, with `points` 1-minute graph entries"""
+    def entry(ts, value):
+        timestamp = datetime.fromtimestamp(ts, timezone.utc).strftime("%m/%d/%Y %I:%M:%S %p")
+        return {"Timestamp": timestamp, "Value": value, "ValueInMgPerDl": round(value * 18)}
+    series = list(generate_series(BENCH_START, points // 1440 + 1))[:points]
+    graph = [entry(ts, value) for ts, value in series]
+    return {"data": {"graphData": graph, "connection": {"glucoseMeasurement": entry(*series[-1])}}}
+
+
+@pytest.mark.parametrize("points", [144, 720])
+@pytest.mark.parametrize("cache", ["cold", "warm"])
+def bench_extract_readings(benchmark, points, cache):
+    """`warm` is the steady state: every poll repeats timestamps the parse cache has already seen"""
+    payload = libre_view_payload(points)
+
+    def setup():
+        if cache == "cold":
+            fetch_glucose.parse_timestamp.cache_clear()
+        else:
+            fetch_glucose.extract_readings(libre_view_payload(points))
+        # extract_readings appends the current measurement to graphData, so each round gets a fresh copy
+        return ({"data": {**payload["data"], "graphData": list(payload["data"]["graphData"])}},), {}
+
+    result = benchmark.pedantic(fetch_glucose.extract_readings, setup=setup, rounds=100)
+    assert len(result["readings"]) == points + 1
@@ -0,0 +1,77 @@
+"""Import throughput of `upsert_readings` per database backend.
+
+SQLite always runs, against its own scratch file. PostgreSQL runs when BENCH_POSTGRES_URL
+points at a database the suite may drop and recreate tables in, e.g.
+
+    BENCH_POSTGRES_URL=postgresql+asyncpg://postgres@localhost/iglu_bench pytest benchmarks -k import
+"""
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import upsert
+from app.db.database import Base
+from app.models import GlucoseCoverageRun, GlucoseReading, GlucoseReadingChange
+from app.repositories.glucose_repository import upsert_readings
+from benchmarks.generate_dataset import generate_series
+
+BENCH_POSTGRES_URL = os.getenv("BENCH_POSTGRES_URL")
+BACKENDS = {
+    "sqlite": f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'iglu-bench-import.db')}",
+    "postgresql": BENCH_POSTGRES_URL,
+}
+START = 1735689600  # 2025-01-01T00:00:00Z
+
+
+@pytest.fixture(scope="module", params=list(BACKENDS))
+def backend_session(request, run):
+    url = BACKENDS[request.param]
+    if url is None:
+        pytest.skip("BENCH_POSTGRES_URL is not set")
+    engine = create_async_engine(url)
+
+    async def reset_schema():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+    run(reset_schema())
+    session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)()
+    yield request.param, session
+    run(session.close())
+    run(engine.dispose())
+
+
+def _truncate(run, session):
+    async def truncate():
+        for model in (GlucoseReading, GlucoseReadingChange, GlucoseCoverageRun):
+            await session.execute(delete(model))
+        await session.commit()
+
+    run(truncate())
+
+
+@pytest.mark.parametrize("strategy", ["default", "on_conflict"])
+@pytest.mark.parametrize("batch_size", [1000, 20000])
+def bench_import_readings(benchmark, run, backend_session, batch_size, strategy, monkeypatch):
+    """Each round imports `batch_size` new readings (about two weeks at 20000) into empty tables"""
+    backend, session = backend_session
+    if strategy == "on_conflict":
+        if backend != "postgresql":
+            pytest.skip("SQLite only has the ON CONFLICT strategy")
+        # Force batched ON CONFLICT on PostgreSQL to compare against COPY + merge
+        monkeypatch.setattr(upsert, "PG_COPY_MIN_ROWS", batch_size + 1)
+    batch = [{"value": v, "timestamp": ts} for ts, v in generate_series(START, batch_size // 1440 + 2, 0)][:batch_size]
+
+    def setup():
+        _truncate(run, session)
+        return (batch,), {}
+
+    changes = benchmark.pedantic(lambda rows: run(upsert_readings(session, rows)), setup=setup, rounds=5)
+    assert len(changes) == batch_size
+    if benchmark.stats:  # None under --benchmark-disable
+        benchmark.extra_info["rows_per_second"] = batch_size / benchmark.stats.stats.mean
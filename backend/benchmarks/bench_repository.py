@@ -0,0 +1,48 @@
+import pytest
+
+from app.repositories.glucose_repository import delete_readings, fetch_readings, upsert_readings
+
+DAY = 86400
+
+
+@pytest.mark.parametrize("days", [1, 7, 30])
+def bench_fetch_readings(benchmark, run, session, dataset, days):
+    _, end = dataset
+    readings = benchmark(lambda: run(fetch_readings(session, end - days * DAY, end)))
+    assert readings
+
+
+def bench_fetch_readings_paged(benchmark, run, session, dataset):
+    first, end = dataset
+    benchmark(lambda: run(fetch_readings(session, first, end, skip=10000, limit=1000, order="desc")))
+
+
+@pytest.mark.parametrize("batch_size", [1, 100, 1000, 10000])
+def bench_upsert_readings(benchmark, run, session, dataset, batch_size):
+    """Each round rewrites the same slots with new values, so every round does real work"""
+    _, end = dataset
+    # Beyond the generated range so the read benchmarks see the same data
+    start = end + 30 * DAY
+    rounds = iter(range(1, 10 ** 6))
+
+    def setup():
+        offset = next(rounds) % 50 / 10
+        return ([{"value": 5.0 + offset, "timestamp": start + i * 60} for i in range(batch_size)],), {}
+
+    benchmark.pedantic(lambda batch: run(upsert_readings(session, batch)), setup=setup, rounds=20 if batch_size >= 10000 else 50)
+
+
+@pytest.mark.parametrize("batch_size", [100, 1000])
+def bench_delete_readings(benchmark, run, session, dataset, batch_size):
+    _, end = dataset
+    start = end + 60 * DAY
+    stop = start + (batch_size - 1) * 60
+    rounds = iter(range(1, 10 ** 6))
+
+    def setup():
+        offset = next(rounds) % 50 / 10
+        run(upsert_readings(session, [{"value": 5.0 + offset, "timestamp": start + i * 60} for i in range(batch_size)]))
+        return (), {}
+
+    deleted = benchmark.pedantic(lambda: run(delete_readings(session, None, start, stop)), setup=setup, rounds=20)
+    assert len(deleted) == batch_size
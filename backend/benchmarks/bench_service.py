@@ -0,0 +1,29 @@
+import pytest
+
+from app.services.coverage_service import get_coverage
+from app.services.export_renderer import EXPORT_FORMATS
+from app.services.glucose_service import GRANULARITY_INTERVALS, export_glucose_readings, get_glucose_readings
+
+DAY = 86400
+
+
+@pytest.mark.parametrize("granularity", ["all", *GRANULARITY_INTERVALS])
+@pytest.mark.parametrize("days", [1, 30])
+def bench_get_glucose_readings(benchmark, run, session, dataset, granularity, days):
+    _, end = dataset
+    rows = benchmark(lambda: run(get_glucose_readings(session, end - days * DAY, end, 0, None, "asc", granularity)))
+    assert rows
+
+
+@pytest.mark.parametrize("format", EXPORT_FORMATS)
+def bench_export_glucose_readings(benchmark, run, session, dataset, format):
+    _, end = dataset
+    result = benchmark(lambda: run(export_glucose_readings(session, format, end - 30 * DAY, end)))
+    assert result
+
+
+@pytest.mark.parametrize("days", [14, 90])
+def bench_get_coverage(benchmark, run, session, dataset, days):
+    _, end = dataset
+    result = benchmark(lambda: run(get_coverage(session, end - days * DAY, end)))
+    assert result["runs"]
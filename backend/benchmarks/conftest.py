@@ -0,0 +1,69 @@
+"""Shared fixtures for the benchmark suite.
+
+The scratch database is configured through the environment before any `app` module is
+imported, because the engine and caches read their settings at import time.
+"""
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+BENCH_DAYS = int(os.getenv("BENCH_DAYS", "90"))
+BENCH_SEED = int(os.getenv("BENCH_SEED", "0"))
+# Fixed end so every run benchmarks the same series
+BENCH_END = 1767225600  # 2026-01-01T00:00:00Z
+BENCH_DB = os.getenv("BENCH_DB", os.path.join(tempfile.gettempdir(), f"iglu-bench-{BENCH_DAYS}d-{BENCH_SEED}.db"))
+
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{BENCH_DB}"
+os.environ.setdefault("ARCHIVE_DIR", os.path.join(tempfile.gettempdir(), "iglu-bench-archive"))
+# Measure the computation, not the range cache or pool hand-off
+os.environ.setdefault("RANGE_CACHE_MAX_BYTES", "0")
+os.environ.setdefault("CPU_EXECUTOR", "inline")
+os.environ.setdefault("SLOW_QUERY_MS", "-1")
+
+import pytest  # noqa: E402
+
+from benchmarks.generate_dataset import build_database  # noqa: E402
+
+
+def schema_is_current(path: str) -> bool:
+    """False when a cached dataset predates a table, column or index the models now define"""
+    from app.db.database import Base
+    conn = sqlite3.connect(path)
+    try:
+        for table in Base.metadata.tables.values():
+            existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table.name})")}
+            if not {c.name for c in table.columns} <= existing:
+                return False
+            indexes = {row[1] for row in conn.execute(f"PRAGMA index_list({table.name})")}
+            if not {i.name for i in table.indexes} <= indexes:
+                return False
+    finally:
+        conn.close()
+    return True
+
+
+@pytest.fixture(scope="session")
+def dataset():
+    """(first_ts, last_ts) of the scratch dataset, generated once per BENCH_DAYS/BENCH_SEED and schema"""
+    if not os.path.exists(BENCH_DB) or os.getenv("BENCH_REGENERATE") or not schema_is_current(BENCH_DB):
+        build_database(BENCH_DB, BENCH_DAYS, BENCH_SEED, BENCH_END)
+    return BENCH_END - BENCH_DAYS * 86400, BENCH_END
+
+
+@pytest.fixture(scope="session")
+def run():
+    """Run a coroutine to completion on one loop shared by the whole session (the engine's pool is bound to it)"""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    from app.db.database import engine
+    loop.run_until_complete(engine.dispose())
+    loop.close()
+
+
+@pytest.fixture
+def session(run, dataset):
+    from app.db.database import SessionLocal
+    db = SessionLocal()
+    yield db
+    run(db.close())
@@ -0,0 +1,122 @@
+"""Generate a synthetic CGM dataset into a scratch SQLite database.
+
+The series is 1-minute readings in mmol/L: a circadian baseline with a dawn rise,
+meal excursions, AR(1) sensor noise, a warm-up gap at every 14-day sensor change
+and random signal-loss gaps.
+
+    python -m benchmarks.generate_dataset --days 730 --db /tmp/iglu-bench.db
+"""
+import argparse
+import math
+import os
+import random
+import sqlite3
+import time
+from typing import Iterator, Tuple
+
+from sqlalchemy import create_engine
+
+# Registers every table on Base.metadata
+from app.core.local_time import local_keys
+from app.db.database import Base
+from app.models import *  # noqa: F401,F403
+from app.repositories.coverage_repository import COVERAGE_MAX_GAP_SECONDS
+
+SENSOR_DAYS = 14
+WARMUP_MINUTES = 60
+# Mean signal-loss gaps per day and their length range in minutes
+GAPS_PER_DAY = 0.4
+GAP_MINUTES = (5, 180)
+MEAL_HOURS = (7.5, 12.5, 19.0)
+HYPOS_PER_DAY = 0.25
+INSERT_BATCH = 50000
+
+
+def generate_series(start: int, days: int, seed: int = 0) -> Iterator[Tuple[int, float]]:
+    """Yield (timestamp, value) for `days` of 1-minute readings starting at `start` (epoch seconds)"""
+    rng = random.Random(seed)
+    start -= start % 60
+    minutes = days * 1440
+    noise = 0.0
+    day_offset = 0.0
+    # Today's excursions as (start minute, peak mmol/L, time to peak in minutes)
+    meals = []
+    gap_until = -1
+    for m in range(minutes):
+        if m % 1440 == 0:
+            day_offset = rng.gauss(0, 0.6)
+            meals = [
+                (m + int((h + rng.gauss(0, 0.5)) * 60), rng.uniform(1.5, 5.5), rng.uniform(40, 75))
+                for h in MEAL_HOURS
+                if rng.random() < 0.9
+            ]
+            # Occasional hypo: a negative excursion at a random time of day
+            if rng.random() < HYPOS_PER_DAY:
+                meals.append((m + rng.randrange(1440), -rng.uniform(2.5, 4.5), rng.uniform(30, 60)))
+        if m % (SENSOR_DAYS * 1440) < WARMUP_MINUTES:
+            continue
+        if m < gap_until:
+            continue
+        if rng.random() < GAPS_PER_DAY / 1440:
+            gap_until = m + rng.randint(*GAP_MINUTES)
+            continue
+        hour = (m % 1440) / 60
+        baseline = 6.0 + day_offset + 0.6 * math.sin((hour - 10) / 24 * 2 * math.pi) + (0.8 if 4 <= hour < 8 else 0.0)
+        excursion = 0.0
+        for meal_start, peak, to_peak in meals:
+            t = m - meal_start
+            if 0 <= t < 360:
+                # Gamma-like rise and slower decay, peaking at `to_peak` minutes
+                excursion += peak * (t / to_peak) * math.exp(1 - t / to_peak)
+        noise = 0.95 * noise + rng.gauss(0, 0.1)
+        value = min(22.2, max(2.2, baseline + excursion + noise))
+        yield start + m * 60, round(value, 1)
+
+
+def build_database(path: str, days: int, seed: int = 0, end: int = None) -> int:
+    """Create the schema at `path` and fill glucose_readings with `days` of data ending at `end`; returns the row count"""
+    if os.path.exists(path):
+        os.remove(path)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    end = end or int(time.time())
+    start = end - days * 86400
+    conn = sqlite3.connect(path)
+    count = 0
+    batch = []
+    runs = []
+    for ts, value in generate_series(start, days, seed):
+        batch.append((value, ts, *local_keys(ts)))
+        # Same runs the ingest path would have maintained in glucose_coverage_runs
+        if runs and ts - runs[-1][1] <= COVERAGE_MAX_GAP_SECONDS:
+            runs[-1][1] = ts
+        else:
+            runs.append([ts, ts])
+        if len(batch) >= INSERT_BATCH:
+            conn.executemany("INSERT INTO glucose_readings (value, timestamp, local_day, local_minute) VALUES (?, ?, ?, ?)", batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        conn.executemany("INSERT INTO glucose_readings (value, timestamp, local_day, local_minute) VALUES (?, ?, ?, ?)", batch)
+        count += len(batch)
+    conn.executemany("INSERT INTO glucose_coverage_runs (start_ts, end_ts) VALUES (?, ?)", runs)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic CGM dataset into a scratch SQLite database")
+    parser.add_argument("--db", default="bench.db", help="SQLite file to (re)create")
+    parser.add_argument("--days", type=int, default=730, help="Days of 1-minute data")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    count = build_database(args.db, args.days, args.seed)
+    print(f"Wrote {count} readings to {args.db} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import asyncio
+
+from app.db.database import SessionLocal
+from app.services.ingest_service import (
+    INGEST_MERGE_POLICY,
+    INGEST_SLOT_POLICY,
+    INGEST_SLOT_SECONDS,
+    compact_readings,
+)
+from loguru import logger
+
+
+async def main():
+    logger.info(f"Compacting onto {INGEST_SLOT_SECONDS}s slots (slot policy: {INGEST_SLOT_POLICY}, merge policy: {INGEST_MERGE_POLICY})")
+    async with SessionLocal() as db:
+        stats = await compact_readings(db)
+    logger.info(f"Done: {stats}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,8 +1,14 @@
 import json
 import os
-from datetime import datetime, timezone
+import time
+from datetime import datetime, timezone, tzinfo
+from functools import lru_cache
+from zoneinfo import ZoneInfo
 
 import httpx
+from app.core.executor import run_cpu
+from app.core.local_time import LOCAL_TIMEZONE
+from app.core.metrics import UPSTREAM_ERRORS, UPSTREAM_REQUEST_SECONDS
 from dotenv import load_dotenv
 from loguru import logger
 
@@ -12,10 +18,32 @@ LIBRE_HOST_URL = os.getenv("LIBRE_HOST_URL")
 LIBRE_EMAIL = os.getenv("LIBRE_EMAIL")
 LIBRE_PASSWORD = os.getenv("LIBRE_PASSWORD")
 LIBRE_USER_ID = os.getenv("LIBRE_USER_ID")
+# Zone of LibreView's local `Timestamp` field, used only when a measurement has no UTC FactoryTimestamp
+LIBRE_TIMEZONE = os.getenv("LIBRE_TIMEZONE", LOCAL_TIMEZONE)
+LIBRE_ZONE = ZoneInfo(LIBRE_TIMEZONE)
 
 TOKEN_ENDPOINT = "auth/login"
 GLUCOSE_ENDPOINT = f"connections/{LIBRE_USER_ID}/graph"
-TOKEN_FILE = "token.json"
+# Where the LibreView session token is cached between runs; point test stubs elsewhere
+TOKEN_FILE = os.getenv("LIBRE_TOKEN_FILE", "token.json")
+
+
+async def _request(endpoint: str, method: str, url: str, **kwargs) -> httpx.Response:
+    """Issue one LibreView request, recording its latency and any failure by endpoint"""
+    start = time.perf_counter()
+    try:
+        async with httpx.AsyncClient() as client:
+            resp = await client.request(method, url, **kwargs)
+        resp.raise_for_status()
+        return resp
+    except httpx.HTTPStatusError as e:
+        UPSTREAM_ERRORS.inc(endpoint, str(e.response.status_code))
+        raise
+    except Exception as e:
+        UPSTREAM_ERRORS.inc(endpoint, type(e).__name__)
+        raise
+    finally:
+        UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint)
 
 
 def save_token(token: str, expiry: int):
@@ -43,10 +71,8 @@ async def get_token():
     url = f"{LIBRE_HOST_URL.rstrip('/')}/{TOKEN_ENDPOINT.lstrip('/')}"
     headers = {"Content-Type": "application/json", "version": "4.7.0", "product": "llu.android"}
     payload = {"email": LIBRE_EMAIL, "password": LIBRE_PASSWORD}
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(url, headers=headers, json=payload)
-        resp.raise_for_status()
-        data = resp.json()
+    resp = await _request("auth/login", "POST", url, headers=headers, json=payload)
+    data = resp.json()
     token = data.get("data", {}).get("authTicket", {}).get("token", None)
     if not token:
         logger.error(f"Failed to retrieve token from response: {data}")
@@ -63,10 +89,25 @@ async def fetch_glucose_readings(token: str) -> dict:
         raise ValueError("LIBRE_HOST_URL is not set")
     url = f"{LIBRE_HOST_URL.rstrip('/')}/{GLUCOSE_ENDPOINT.lstrip('/')}"
     headers = {"Authorization": f"Bearer {token}", "version": "4.7.0", "product": "llu.android"}
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, headers=headers)
-        resp.raise_for_status()
-        return extract_readings(resp.json())
+    resp = await _request("connections/graph", "GET", url, headers=headers)
+    payload = resp.json()
+    # Timestamp parsing is CPU-bound; keep it off the event loop
+    return await run_cpu(extract_readings, payload)
+
+
+@lru_cache(maxsize=4096)
+def parse_timestamp(ts_str: str, zone: tzinfo = timezone.utc) -> int:
+    """Parse LibreView's month/day/year AM/PM time in `zone` into epoch seconds; cached as every poll repeats ~12h of graph points"""
+    dt = datetime.strptime(ts_str, '%m/%d/%Y %I:%M:%S %p')
+    dt = dt.replace(tzinfo=zone)
+    return int(dt.timestamp())
+
+
+def reading_timestamp(item: dict) -> int:
+    """Epoch seconds of a LibreView measurement: FactoryTimestamp is UTC, Timestamp is the sensor's local wall clock"""
+    if item.get('FactoryTimestamp'):
+        return parse_timestamp(item['FactoryTimestamp'])
+    return parse_timestamp(item.get('Timestamp'), LIBRE_ZONE)
 
 
 def extract_readings(api_resp: dict) -> dict:
@@ -79,12 +120,7 @@ def extract_readings(api_resp: dict) -> dict:
         graph.append(current_measurement)
     readings = []
     for item in graph:
-        ts_str = item.get('Timestamp')
-        # parse month/day/year time with AM/PM
-        dt = datetime.strptime(ts_str, '%m/%d/%Y %I:%M:%S %p')
-        # assume UTC
-        dt = dt.replace(tzinfo=timezone.utc)
-        ts = int(dt.timestamp())
+        ts = reading_timestamp(item)
         readings.append({'value': item.get('Value'), 'timestamp': ts})
     return {"readings": readings, "current_measurement": current_measurement}
 
@@ -0,0 +1,126 @@
+"""Local stand-in for the LibreView API, for load tests and offline development.
+
+Implements `POST /auth/login` and `GET /connections/{id}/graph` with scripted readings,
+latency and failures. Point the backend at it with `LIBRE_HOST_URL`:
+
+    uvicorn loadtest.libre_stub:app --port 8001
+    LIBRE_HOST_URL=http://localhost:8001 FETCH_INTERVAL_SECONDS=5 uvicorn main:app
+
+A new reading appears every STUB_READING_INTERVAL seconds, stamped with the time it
+appeared. Behaviour can be changed at runtime with `POST /_stub/config`, and
+`GET /_stub/served` reports when each reading was first handed out, for measuring
+ingest-to-delivery lag.
+"""
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+STUB_READING_INTERVAL = int(os.getenv("STUB_READING_INTERVAL", "60"))
+# Graph window returned by the graph endpoint, like LibreView's 12 hours
+STUB_HISTORY_SECONDS = int(os.getenv("STUB_HISTORY_SECONDS", str(12 * 3600)))
+# JSON list of mmol/L values cycled one per reading; a sine wave with noise when unset
+STUB_SCRIPT = os.getenv("STUB_SCRIPT")
+
+
+class StubConfig(BaseModel):
+    latency_ms: float = float(os.getenv("STUB_LATENCY_MS", "150"))
+    jitter_ms: float = float(os.getenv("STUB_JITTER_MS", "50"))
+    # Probability that a request fails with failure_status
+    failure_rate: float = float(os.getenv("STUB_FAILURE_RATE", "0"))
+    failure_status: int = int(os.getenv("STUB_FAILURE_STATUS", "500"))
+    # Every request fails until this unix time (scripted outage)
+    outage_until: Optional[float] = None
+
+
+config = StubConfig()
+script = None
+if STUB_SCRIPT:
+    with open(STUB_SCRIPT) as f:
+        script = json.load(f)
+# reading timestamp -> unix time it was first served
+served: dict = {}
+
+app = FastAPI(title="LibreView stub")
+
+
+def reading_value(ts: int) -> float:
+    index = ts // STUB_READING_INTERVAL
+    if script:
+        return float(script[index % len(script)])
+    rng = random.Random(index)
+    return round(7.0 + 3.0 * math.sin(2 * math.pi * ts / (3 * 3600)) + rng.gauss(0, 0.2), 1)
+
+
+def libre_timestamp(ts: int) -> str:
+    # LibreView's month/day/year 12-hour format; the stub's wall clock is UTC
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%m/%d/%Y %I:%M:%S %p")
+
+
+def measurement(ts: int) -> dict:
+    value = reading_value(ts)
+    return {
+        "FactoryTimestamp": libre_timestamp(ts),
+        "Timestamp": libre_timestamp(ts),
+        "Value": value,
+        "ValueInMgPerDl": round(value * 18),
+    }
+
+
+async def simulate() -> None:
+    """Apply the configured latency and scripted failures to one request"""
+    delay = max(0.0, random.gauss(config.latency_ms, config.jitter_ms)) / 1000
+    await asyncio.sleep(delay)
+    if config.outage_until is not None and time.time() < config.outage_until:
+        raise HTTPException(status_code=config.failure_status, detail="Scripted outage")
+    if random.random() < config.failure_rate:
+        raise HTTPException(status_code=config.failure_status, detail="Scripted failure")
+
+
+@app.post("/auth/login")
+async def login():
+    await simulate()
+    return {"status": 0, "data": {"authTicket": {"token": "stub-token", "expires": int(time.time()) + 86400}}}
+
+
+@app.get("/connections/{user_id}/graph")
+async def graph(user_id: str):
+    await simulate()
+    now = time.time()
+    latest = int(now) - int(now) % STUB_READING_INTERVAL
+    timestamps = range(latest - STUB_HISTORY_SECONDS + STUB_READING_INTERVAL, latest, STUB_READING_INTERVAL)
+    for ts in (*timestamps, latest):
+        served.setdefault(ts, now)
+    return {
+        "status": 0,
+        "data": {
+            "connection": {"patientId": user_id, "glucoseMeasurement": measurement(latest)},
+            "graphData": [measurement(ts) for ts in timestamps],
+        },
+    }
+
+
+@app.get("/_stub/config", response_model=StubConfig)
+async def get_config():
+    return config
+
+
+@app.post("/_stub/config", response_model=StubConfig)
+async def set_config(update: StubConfig):
+    """Replace latency/failure settings, e.g. {"failure_rate": 1, "outage_until": <unix time>}"""
+    global config
+    config = update
+    return config
+
+
+@app.get("/_stub/served")
+async def get_served():
+    """Unix time each reading timestamp was first returned by the graph endpoint"""
+    return {str(ts): at for ts, at in served.items()}
@@ -0,0 +1,190 @@
+"""Async load generator for the backend API.
+
+Drives many API-key clients through a weighted mix of read endpoints while SSE
+subscribers listen on /glucose-readings/stream. Reports throughput, p50/p99
+latency per endpoint, and delivery lag of streamed readings: from the reading's
+sensor time, and from when the LibreView stub first served it.
+
+    python -m loadtest.load_generator --api-keys KEY1,KEY2 --clients 50 --subscribers 20 --duration 120
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from typing import List, Optional
+
+import httpx
+
+DAY = 86400
+# (name, weight, path, params factory)
+ENDPOINTS = [
+    ("readings_1d_1m", 40, "/api/glucose-readings/", lambda now: {"from": now - DAY, "to": now, "granularity": "1m", "limit": 2000}),
+    ("readings_7d_1h", 15, "/api/glucose-readings/", lambda now: {"from": now - 7 * DAY, "to": now, "granularity": "1h", "limit": 2000}),
+    ("latest", 25, "/api/glucose-readings/latest", lambda now: {}),
+    ("stats_14d", 10, "/api/glucose-readings/stats", lambda now: {"from": now - 14 * DAY, "to": now}),
+    ("libre_current", 10, "/api/libre-view/current", lambda now: {}),
+]
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))]
+
+
+class Results:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(lambda: defaultdict(int))
+        # (received_at, event, payload) per SSE message
+        self.deliveries = []
+
+
+async def api_client(client: httpx.AsyncClient, api_key: str, deadline: float, think_time: float, results: Results):
+    names, weights = zip(*[(e[0], e[1]) for e in ENDPOINTS])
+    by_name = {e[0]: e for e in ENDPOINTS}
+    headers = {"X-API-KEY": api_key}
+    while time.monotonic() < deadline:
+        name, _, path, params = by_name[random.choices(names, weights)[0]]
+        start = time.perf_counter()
+        try:
+            resp = await client.get(path, params=params(int(time.time())), headers=headers)
+            elapsed = time.perf_counter() - start
+            if resp.status_code >= 400:
+                results.errors[name][str(resp.status_code)] += 1
+            else:
+                results.latencies[name].append(elapsed)
+        except httpx.HTTPError as e:
+            results.errors[name][type(e).__name__] += 1
+        if think_time:
+            await asyncio.sleep(random.expovariate(1 / think_time))
+
+
+async def sse_subscriber(client: httpx.AsyncClient, api_key: str, deadline: float, results: Results):
+    headers = {"X-API-KEY": api_key, "Accept": "text/event-stream"}
+    timeout = httpx.Timeout(10, read=None)
+    while time.monotonic() < deadline:
+        try:
+            async with client.stream("GET", "/api/glucose-readings/stream", params={"granularity": "all", "limit": 0},
+                                     headers=headers, timeout=timeout) as resp:
+                event = None
+                async for line in resp.aiter_lines():
+                    if line.startswith("event:"):
+                        event = line[6:].strip()
+                    elif line.startswith("data:"):
+                        results.deliveries.append((time.time(), event, json.loads(line[5:])))
+                        event = None
+                    if time.monotonic() >= deadline:
+                        return
+        except httpx.HTTPError as e:
+            results.errors["stream"][type(e).__name__] += 1
+            await asyncio.sleep(1)
+
+
+async def fetch_served(stub_url: Optional[str]) -> dict:
+    if not stub_url:
+        return {}
+    async with httpx.AsyncClient(base_url=stub_url) as client:
+        resp = await client.get("/_stub/served")
+        resp.raise_for_status()
+        return {int(ts): at for ts, at in resp.json().items()}
+
+
+def delivery_lags(deliveries: list, served: dict) -> tuple:
+    """(sensor-to-client, stub-to-client) lags in seconds for streamed readings"""
+    sensor, ingest = [], []
+    for received_at, event, payload in deliveries:
+        if event is not None:
+            continue
+        for reading in payload if isinstance(payload, list) else [payload]:
+            ts = reading["timestamp"]
+            sensor.append(received_at - ts)
+            served_at = served.get(ts)
+            if served_at is not None:
+                ingest.append(received_at - served_at)
+    return sensor, ingest
+
+
+def report(results: Results, duration: float, served: dict) -> dict:
+    endpoints = {}
+    total = 0
+    for name, values in sorted(results.latencies.items()):
+        total += len(values)
+        endpoints[name] = {
+            "requests": len(values),
+            "rps": len(values) / duration,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "errors": dict(results.errors.get(name, {})),
+        }
+    everything = [v for values in results.latencies.values() for v in values]
+    sensor, ingest = delivery_lags(results.deliveries, served)
+
+    def ms(value):
+        return None if value is None else value * 1000
+
+    return {
+        "duration_s": duration,
+        "requests": total,
+        "throughput_rps": total / duration,
+        "p50_ms": ms(percentile(everything, 50)),
+        "p99_ms": ms(percentile(everything, 99)),
+        "errors": {name: dict(counts) for name, counts in results.errors.items()},
+        "endpoints": endpoints,
+        "sse": {
+            "messages": len(results.deliveries),
+            "alerts": sum(1 for _, event, _ in results.deliveries if event == "alert"),
+            "sensor_to_client_p50_ms": ms(percentile(sensor, 50)),
+            "sensor_to_client_p99_ms": ms(percentile(sensor, 99)),
+            "ingest_to_client_p50_ms": ms(percentile(ingest, 50)),
+            "ingest_to_client_p99_ms": ms(percentile(ingest, 99)),
+        },
+    }
+
+
+async def run(args) -> dict:
+    api_keys = args.api_keys.split(",")
+    results = Results()
+    limits = httpx.Limits(max_connections=args.clients + args.subscribers + 10)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+        deadline = time.monotonic() + args.duration
+        tasks = [
+            asyncio.ensure_future(api_client(client, api_keys[i % len(api_keys)], deadline, args.think_time, results))
+            for i in range(args.clients)
+        ] + [
+            asyncio.ensure_future(sse_subscriber(client, api_keys[i % len(api_keys)], deadline, results))
+            for i in range(args.subscribers)
+        ]
+        # Subscribers block on the stream between readings; cancel whatever is still waiting shortly after the deadline
+        _, pending = await asyncio.wait(tasks, timeout=args.duration + 5)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+    return report(results, args.duration, await fetch_served(args.stub_url))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the backend API with API-key clients and SSE subscribers")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--api-keys", required=True, help="Comma-separated API keys; clients cycle through them")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--subscribers", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=60, help="Seconds")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean seconds between a client's requests")
+    parser.add_argument("--stub-url", default=None, help="LibreView stub URL, for ingest-to-client lag")
+    parser.add_argument("--output", default=None, help="Also write the JSON report here")
+    args = parser.parse_args()
+    summary = asyncio.run(run(args))
+    text = json.dumps(summary, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,65 @@
 import asyncio
-import json
+import os
+import time
 from contextlib import asynccontextmanager
 
-import fetch_glucose
-from app.api import glucose_readings
+from app.api import debug, glucose_readings, libre_view
 from app.api.glucose_readings import fetch_and_save_remote_readings
+from app.core.auth import check_admin_key, check_api_key, check_websocket_key, is_admin_key
+from app.core.executor import shutdown_executor
+from app.core.loop_monitor import loop_lag_stats, start_loop_monitor, stop_loop_monitor
+from app.core.metrics import (
+    CONTENT_TYPE,
+    FETCH_LOOP_ERRORS,
+    FETCH_LOOP_LAST_SUCCESS,
+    FETCH_LOOP_SECONDS,
+    MetricsMiddleware,
+    render_metrics,
+)
+from app.core.profiler import ProfilerMiddleware
+from app.core.request_context import RequestContextMiddleware
 from app.db.database import SessionLocal
-from app.db.sse_queue import sse_queue
-from app.models.api_user import ApiUser
-from app.models.glucose_reading import GlucoseReading
-from app.repositories.glucose_repository import upsert_readings
-from fastapi import Depends, FastAPI, HTTPException, Security
+from app.db.range_cache import range_cache
+from app.services.ingest_service import ingest_readings
+from app.services.libre_view_service import refresh_snapshot
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import APIKeyHeader
+from fastapi.responses import Response
 from loguru import logger
-from sqlalchemy import select
+
+# Seconds between LibreView polls; shorten for load tests against the local stub
+FETCH_INTERVAL_SECONDS = float(os.getenv("FETCH_INTERVAL_SECONDS", "60"))
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Launch background task to fetch and save remote readings every minute"""
+    """Launch background task to fetch and save remote readings every FETCH_INTERVAL_SECONDS"""
     async def fetch_loop():
         while True:
+            start = time.perf_counter()
             try:
                 async with SessionLocal() as db:
                     # await fetch_and_save_remote_readings(db)
                     logger.info("Service: fetching remote readings")
-                    token = await fetch_glucose.get_token()
-                    readings = await fetch_glucose.fetch_glucose_readings(token)
+                    # Shares the snapshot (and any in-flight request) with the libre-view router
+                    readings = await refresh_snapshot(bypass_breaker=True)
                     logger.debug(f"readings: {readings}")
-                    data = sorted([dict(value=r["value"], timestamp=r["timestamp"]) for r in readings["readings"]], key=lambda x: x["timestamp"])
-                    
-                    stmt = select(GlucoseReading).where(
-                        GlucoseReading.timestamp >= data[0]["timestamp"],
-                    )
-                    result = await db.execute(stmt)
-                    db_data = [(r.value, r.timestamp) for r in result.scalars().all()]
-                    db_data = sorted(db_data, key=lambda x: x[1])
-                    new_data = list({"value": e[0], "timestamp": e[1]} for e in set((r["value"], r["timestamp"]) for r in data) - set(db_data))      
-                    if new_data:
-                        logger.info(f"Adding new data to SSE queue: {new_data[-1]}")
-                        await sse_queue.put(json.dumps([new_data[-1]]))
-                    if data:
-                        await upsert_readings(db, data)
+                    # Snaps to canonical sensor slots and publishes new or changed readings to stream subscribers
+                    await ingest_readings(db, [dict(value=r["value"], timestamp=r["timestamp"]) for r in readings["readings"]])
                     logger.info(f"Service: fetched and saved {len(readings)} remote readings")
+                FETCH_LOOP_LAST_SUCCESS.set(time.time())
             except Exception:
+                FETCH_LOOP_ERRORS.inc()
                 logger.exception("Error in scheduled fetch_and_save_remote_readings")
-            await asyncio.sleep(60)
+            FETCH_LOOP_SECONDS.observe(time.perf_counter() - start)
+            await asyncio.sleep(FETCH_INTERVAL_SECONDS)
     fetch_loop_task = asyncio.ensure_future(fetch_loop())
+    start_loop_monitor()
     yield
     # Cleanup code can be added here if needed
     fetch_loop_task.cancel()
+    stop_loop_monitor()
+    shutdown_executor()
     
     
 app = FastAPI(
@@ -69,24 +78,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-api_key_header = APIKeyHeader(name="X-API-KEY", auto_error=False)
+app.add_middleware(RequestContextMiddleware)
+# Only requests flagged with X-Profile or ?profile= are sampled
+app.add_middleware(ProfilerMiddleware, authorize=is_admin_key)
+# Outermost, so the recorded latency covers every other middleware
+app.add_middleware(MetricsMiddleware)
 
-async def check_api_key(api_key: str = Security(api_key_header)) -> None:
-    async with SessionLocal() as db:
-        stmt = select(ApiUser).where(ApiUser.api_key == api_key)
-        result = await db.execute(stmt)
-        user = result.scalar_one_or_none()
-        if not user or not user.is_active:
-            raise HTTPException(status_code=401, detail="Invalid API key")
-    
 # Include routers
 app.include_router(glucose_readings.router, prefix="/api", dependencies=[Depends(check_api_key)])
+app.include_router(glucose_readings.websocket_router, prefix="/api", dependencies=[Depends(check_websocket_key)])
+app.include_router(libre_view.router, prefix="/api", dependencies=[Depends(check_api_key)])
+app.include_router(debug.router, prefix="/api", dependencies=[Depends(check_admin_key)])
 
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Diabetes Management API"}
 
+@app.get("/health")
+async def health(reset_max: bool = False):
+    """Liveness, event-loop lag (seconds) and range cache hit ratio"""
+    return {
+        "status": "ok",
+        "event_loop_lag": loop_lag_stats(reset_max),
+        "range_cache": range_cache.stats(),
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of request, database, poller, upstream and SSE metrics"""
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,24 @@
+import argparse
+import asyncio
+
+from app.db.database import SessionLocal
+from app.services.restamp_service import restamp_readings
+from loguru import logger
+
+
+async def main(timezone_name: str, since: int, until: int):
+    async with SessionLocal() as db:
+        stats = await restamp_readings(db, timezone_name, since, until)
+    logger.info(f"Done: {stats}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Re-stamp readings that older versions stored by parsing LibreView's local Timestamp as UTC. "
+                    "Runs at most once per database."
+    )
+    parser.add_argument("--timezone", required=True, help="IANA zone of the LibreView account, e.g. Europe/Berlin")
+    parser.add_argument("--until", type=int, required=True, help="Stored timestamp (exclusive) up to which readings were written by the old poller")
+    parser.add_argument("--since", type=int, default=0, help="Stored timestamp (inclusive) from which to re-stamp (default: all)")
+    args = parser.parse_args()
+    asyncio.run(main(args.timezone, args.since, args.until))